@@ -1,3 +1,9 @@
+import argparse
+import os
+import sys
+
+import objformat
+
 class assembler:
     """Assembler class to assemble 8085 assembly code into machine code. and write it to the memory of a cpu object.
     """
@@ -33,8 +39,8 @@ class assembler:
             'SUI': {'size': 2, 'format': 'AI', 'code': 0xD6},  
             'SBB': {'size': 1, 'format': 'RA', 'code': 0x98},   # Base code 10011rrr
             'SBI': {'size': 2, 'format': 'AI', 'code': 0xDE},  
-            'INR': {'size': 1, 'format': 'RA', 'code': 0x04},   # Base code 00rrRA00
-            'DCR': {'size': 1, 'format': 'RA', 'code': 0x05},   # Base code 00rrRA01
+            'INR': {'size': 1, 'format': 'RA', 'code': 0x04},   # Base code 00rrr100
+            'DCR': {'size': 1, 'format': 'RA', 'code': 0x05},   # Base code 00rrr101
             'INX': {'size': 1, 'format': 'RP', 'code': 0x03},   # Base code 00rp0011
             'DCX': {'size': 1, 'format': 'RP', 'code': 0x0B},   # Base code 00rp1011
             'DAD': {'size': 1, 'format': 'RP', 'code': 0x09},   # Base code 00rp1001
@@ -159,6 +165,9 @@ class assembler:
             return base_code | (rp_codes[dest] << 4)
         elif instruction['format'] == 'RA':
             # Accumulator and register operations (e.g., ADD, SUB)
+            if mnemonic in ('INR', 'DCR'):
+                # INR/DCR encode the register in bits 5-3 (00rrr10x)
+                return base_code | (self.register_codes[src] << 3)
             return base_code | self.register_codes[src]
         elif instruction['format'] == 'AI':
             # Accumulator and immediate operations (e.g., ADI, SUI)
@@ -174,136 +183,169 @@ class assembler:
             return base_code
     
     # the actual assambling of the code into machine code
-    def assemble(self, filename:str, start_address:int, cpu)->int:
-        """ Assemble the given file into machine code and write to memory associated with a given cpu object.
+    def assemble_bytes(self, filename:str)->bytes:
+        """ Assemble the given file into machine code without writing it anywhere.
+        The source holds absolute addresses, so the code does not depend on where it is loaded.
         Keyword arguments:
         filename -- the name of the file to assemble
-        start_address -- the address to start writing the machine code
-        cpu -- the CPU object whose memory will be written
         
-        Return: number of bytes written to memory
+        Return: the machine code (bytes)
+        Raises: FileNotFoundError, SyntaxError or ValueError; current_line holds the failing line
         """
         
-        current_address = start_address
-        try:
-            with open(filename, 'r') as f:
-                for line_num, line in enumerate(f, 1):
-                    parts = self.parse_line(line)
-                    if not parts:
-                        continue
-                        
-                    mnemonic = parts[0]
+        code = bytearray()
+        self.current_line = 0
+        with open(filename, 'r') as f:
+            for line_num, line in enumerate(f, 1):
+                self.current_line = line_num
+                parts = self.parse_line(line)
+                if not parts:
+                    continue
                     
-                    if mnemonic not in self.instruction_set:
-                        raise SyntaxError(f"Invalid instruction '{mnemonic}' at line {line_num}")
+                mnemonic = parts[0]
+                
+                if mnemonic not in self.instruction_set:
+                    raise SyntaxError(f"Invalid instruction '{mnemonic}' at line {line_num}")
+                
+                inst_format = self.instruction_set[mnemonic]['format']
+                inst_size = self.instruction_set[mnemonic]['size']
+                
+                # No operand instructions (e.g., HLT, RET)
+                if inst_format == 'N':
+                    opcode = self.get_opcode(mnemonic)
+                    code.append(opcode)
                     
-                    inst_format = self.instruction_set[mnemonic]['format']
-                    inst_size = self.instruction_set[mnemonic]['size']
+                # Register to Register instructions (e.g., MOV)
+                elif inst_format == 'RR':
+                    if len(parts) != 3:
+                        raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
+                    dest, src = parts[1].strip(','), parts[2]
+                    opcode = self.get_opcode(mnemonic, dest, src)
+                    code.append(opcode)
                     
-                    # No operand instructions (e.g., HLT, RET)
-                    if inst_format == 'N':
-                        opcode = self.get_opcode(mnemonic)
-                        cpu.write_memory(current_address, opcode)
-                        current_address += 1
-                        
-                    # Register to Register instructions (e.g., MOV)
-                    elif inst_format == 'RR':
-                        if len(parts) != 3:
-                            raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
-                        dest, src = parts[1].strip(','), parts[2]
-                        opcode = self.get_opcode(mnemonic, dest, src)
-                        cpu.write_memory(current_address, opcode)
-                        current_address += 1
-                        
-                    # Register with immediate value (e.g., MVI)
-                    elif inst_format == 'RI':
+                # Register with immediate value (e.g., MVI)
+                elif inst_format == 'RI':
+                    if len(parts) != 3:
+                        raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
+                    dest = parts[1].strip(',')
+                    imm = self._parse_number(parts[2])
+                    opcode = self.get_opcode(mnemonic, dest)
+                    code.append(opcode)
+                    code.append(imm & 0xFF)
+                    
+                # Register pair operations (e.g., LXI)
+                elif inst_format == 'RP':
+                    if mnemonic in ['LXI']:
                         if len(parts) != 3:
                             raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
                         dest = parts[1].strip(',')
                         imm = self._parse_number(parts[2])
                         opcode = self.get_opcode(mnemonic, dest)
-                        cpu.write_memory(current_address, opcode)
-                        cpu.write_memory(current_address + 1, imm)
-                        current_address += 2
-                        
-                    # Register pair operations (e.g., LXI)
-                    elif inst_format == 'RP':
-                        if mnemonic in ['LXI']:
-                            if len(parts) != 3:
-                                raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
-                            dest = parts[1].strip(',')
-                            imm = self._parse_number(parts[2])
-                            opcode = self.get_opcode(mnemonic, dest)
-                            cpu.write_memory(current_address, opcode)
-                            cpu.write_memory(current_address + 1, imm & 0xFF)
-                            cpu.write_memory(current_address + 2, (imm >> 8) & 0xFF)
-                            current_address += 3
-                        else:  # PUSH, POP, INX, DCX, DAD
-                            if len(parts) != 2:
-                                raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
-                            dest = parts[1]
-                            opcode = self.get_opcode(mnemonic, dest)
-                            cpu.write_memory(current_address, opcode)
-                            current_address += 1
-                        
-                    # Address-based instructions (e.g., JMP, LDA)
-                    elif inst_format == 'A':
-                        if len(parts) != 2:
-                            raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
-                        addr = self._parse_number(parts[1])
-                        opcode = self.get_opcode(mnemonic)
-                        cpu.write_memory(current_address, opcode)
-                        cpu.write_memory(current_address + 1, addr & 0xFF)
-                        cpu.write_memory(current_address + 2, (addr >> 8) & 0xFF)
-                        current_address += 3
-                        
-                    # Accumulator operations (e.g., ADD A)
-                    elif inst_format == 'RA':
+                        code.append(opcode)
+                        code.append(imm & 0xFF)
+                        code.append((imm >> 8) & 0xFF)
+                    else:  # PUSH, POP, INX, DCX, DAD
                         if len(parts) != 2:
                             raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
-                        src = parts[1]
-                        opcode = self.get_opcode(mnemonic, src=src)
-                        cpu.write_memory(current_address, opcode)
-                        current_address += 1
-                        
-                    # Accumulator with immediate (e.g., ADI)
-                    elif inst_format == 'AI':
-                        if len(parts) != 2:
-                            raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
-                        imm = self._parse_number(parts[1])
-                        opcode = self.get_opcode(mnemonic)
-                        cpu.write_memory(current_address, opcode)
-                        cpu.write_memory(current_address + 1, imm)
-                        current_address += 2
-                        
-                    # RST instructions
-                    elif inst_format == 'RST':
-                        if len(parts) != 2:
-                            raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
-                        vec = int(parts[1])
-                        if not 0 <= vec <= 7:
-                            raise ValueError(f"RST vector must be between 0-7, got {vec}")
-                        opcode = self.get_opcode(mnemonic, dest=str(vec))
-                        cpu.write_memory(current_address, opcode)
-                        current_address += 1
-                        
-                    # I/O instructions (IN, OUT)
-                    elif inst_format == 'IO':
-                        if len(parts) != 2:
-                            raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
-                        port = self._parse_number(parts[1])
-                        opcode = self.get_opcode(mnemonic)
-                        cpu.write_memory(current_address, opcode)
-                        cpu.write_memory(current_address + 1, port)
-                        current_address += 2
+                        dest = parts[1]
+                        opcode = self.get_opcode(mnemonic, dest)
+                        code.append(opcode)
+                    
+                # Address-based instructions (e.g., JMP, LDA)
+                elif inst_format == 'A':
+                    if len(parts) != 2:
+                        raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
+                    addr = self._parse_number(parts[1])
+                    opcode = self.get_opcode(mnemonic)
+                    code.append(opcode)
+                    code.append(addr & 0xFF)
+                    code.append((addr >> 8) & 0xFF)
+                    
+                # Accumulator operations (e.g., ADD A)
+                elif inst_format == 'RA':
+                    if len(parts) != 2:
+                        raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
+                    src = parts[1]
+                    opcode = self.get_opcode(mnemonic, src=src)
+                    code.append(opcode)
+                    
+                # Accumulator with immediate (e.g., ADI)
+                elif inst_format == 'AI':
+                    if len(parts) != 2:
+                        raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
+                    imm = self._parse_number(parts[1])
+                    opcode = self.get_opcode(mnemonic)
+                    code.append(opcode)
+                    code.append(imm & 0xFF)
+                    
+                # RST instructions
+                elif inst_format == 'RST':
+                    if len(parts) != 2:
+                        raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
+                    vec = int(parts[1])
+                    if not 0 <= vec <= 7:
+                        raise ValueError(f"RST vector must be between 0-7, got {vec}")
+                    opcode = self.get_opcode(mnemonic, dest=str(vec))
+                    code.append(opcode)
+                    
+                # I/O instructions (IN, OUT)
+                elif inst_format == 'IO':
+                    if len(parts) != 2:
+                        raise SyntaxError(f"Invalid operands for {mnemonic} at line {line_num}")
+                    port = self._parse_number(parts[1])
+                    opcode = self.get_opcode(mnemonic)
+                    code.append(opcode)
+                    code.append(port & 0xFF)
 
-            return current_address - start_address  # Return number of bytes written
+        return bytes(code)
+
+    def assemble(self, filename:str, start_address:int, cpu)->int:
+        """ Assemble the given file into machine code and write to memory associated with a given cpu object.
+        Keyword arguments:
+        filename -- the name of the file to assemble
+        start_address -- the address to start writing the machine code
+        cpu -- the CPU object whose memory will be written
+        
+        Return: number of bytes written to memory
+        """
+        try:
+            code = self.assemble_bytes(filename)
         except FileNotFoundError:
             print(f"Error: File '{filename}' not found")
             return 0
         except Exception as e:
-            print(f"Error at line {line_num}: {str(e)}")
+            print(f"Error at line {self.current_line}: {str(e)}")
             return 0
+        cpu.write_block(start_address, code)
+        return len(code)  # Return number of bytes written
+
+    def assemble_to_hex(self, filename:str, start_address:int, output:str)->int:
+        """ Assemble the given file and save the machine code as an Intel HEX file.
+        Keyword arguments:
+        filename -- the name of the file to assemble
+        start_address -- the address the machine code will be loaded at
+        output -- the name of the Intel HEX file to write
+        
+        Return: number of bytes assembled
+        """
+        code = self.assemble_bytes(filename)
+        with open(output, 'w') as f:
+            f.write(objformat.encode_intel_hex(code, start_address))
+        return len(code)
+
+    def assemble_to_binary(self, filename:str, output:str)->int:
+        """ Assemble the given file and save the machine code as a raw binary image.
+        The image holds no load address, give it when loading the image.
+        Keyword arguments:
+        filename -- the name of the file to assemble
+        output -- the name of the binary file to write
+        
+        Return: number of bytes assembled
+        """
+        code = self.assemble_bytes(filename)
+        with open(output, 'wb') as f:
+            f.write(code)
+        return len(code)
 
     def _parse_number(self, value_str):
         """Parse a number from string, supporting hex (with H suffix) and decimal."""
@@ -311,4 +353,26 @@ class assembler:
         if value_str.upper().endswith('H'):
             return int(value_str[:-1], 16)
         else:
-            return int(value_str)
\ No newline at end of file
+            return int(value_str)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assemble 8085 source into an Intel HEX or raw binary image.")
+    parser.add_argument('source', help='assembly source file')
+    parser.add_argument('output', help='output file, .hex/.ihx for Intel HEX, anything else for raw binary')
+    parser.add_argument('--origin', type=lambda value: int(value, 0), default=0,
+                        help='load address recorded in Intel HEX output (default 0)')
+    args = parser.parse_args()
+    asm = assembler()
+    try:
+        if os.path.splitext(args.output)[1].lower() in objformat.HEX_EXTENSIONS:
+            size = asm.assemble_to_hex(args.source, args.origin, args.output)
+        else:
+            size = asm.assemble_to_binary(args.source, args.output)
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found")
+        sys.exit(1)
+    except (SyntaxError, ValueError) as e:
+        print(f"Error at line {asm.current_line}: {str(e)}")
+        sys.exit(1)
+    print(f"Total {size} bytes assembled into {args.output}.")
@@ -0,0 +1,815 @@
+"""Throughput benchmarks and differential conformance checks for the 8085 execution paths.
+
+Usage:
+    python benchmark.py [--repeat N] [--json FILE] [--compare FILE] [--tolerance T]
+    python benchmark.py --conformance [--trials N] [--seed S]
+
+The benchmark mode reports instructions/sec, assembly lines/sec, byte-by-byte
+memory load and Intel HEX image load throughput for every execution path and
+can store the results as JSON for later regression comparison. The conformance mode runs the benchmark programs in
+lockstep and sweeps every opcode from randomized initial states, flagging any
+divergence in registers, flags, T-states or memory between the execution paths.
+It also checks that fast-forwarded delay loops end in the same state as
+stepping through them, that stepping back with timetravel restores the
+state an uninterrupted run reaches, and that runs answered by the result
+cache leave the CPU and its devices as running the program does. Object
+images are checked for encode/parse round trips, rejection of malformed
+Intel HEX records and of overlapping images.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import py8085 as py85
+import assembler
+import cache
+import devices
+import objformat
+import timetravel
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+# Workload name -> assembly source and initial memory contents
+WORKLOADS = {
+    'memcpy': {'source': 'memcpy.asm', 'setup': {0x1000: bytes(range(256))}},
+    'muldiv': {'source': 'muldiv.asm', 'setup': {}},
+    'bcd': {'source': 'bcd.asm', 'setup': {}},
+    'recursion': {'source': 'recursion.asm', 'setup': {}},
+    'pushpop': {'source': 'pushpop.asm', 'setup': {}},
+    'delay': {'source': 'delay.asm', 'setup': {}},
+}
+
+# Execution paths are the py8085 backends; the pure Python one is the conformance reference
+REFERENCE_PATH = 'python'
+
+# Upper bound on instructions per workload, guards against runaway programs
+MAX_INSTRUCTIONS = 1000000
+
+
+def create_cpu(path):
+    """
+    Create a CPU driven by the given execution path with tracing disabled.
+
+    Keyword arguments:
+    path -- execution path name, a py8085 backend name (str)
+
+    Return: CPU8085 object
+    """
+    cpu = py85.get_backend(path, fallback=False).create_cpu()
+    cpu.executor.set_trace(False)
+    return cpu
+
+
+def workload_source(name):
+    """
+    Get the path of the assembly source of a workload.
+
+    Keyword arguments:
+    name -- workload name, a key of WORKLOADS (str)
+
+    Return: path of the source file (str)
+    """
+    return os.path.join(BENCHMARK_DIR, WORKLOADS[name]['source'])
+
+
+def load_workload(cpu, name):
+    """
+    Assemble a workload into the CPU memory and apply its memory setup.
+
+    Keyword arguments:
+    cpu -- CPU8085 object to load (CPU8085)
+    name -- workload name, a key of WORKLOADS (str)
+
+    Return: number of bytes assembled (int)
+    """
+    size = assembler.assembler().assemble(workload_source(name), 0x0000, cpu=cpu)
+    if size == 0:
+        raise RuntimeError(f"Workload '{name}' failed to assemble")
+    for address, data in WORKLOADS[name]['setup'].items():
+        for offset, value in enumerate(data):
+            cpu.write_memory(address + offset, value)
+    return size
+
+
+def measure_execution(path, name):
+    """
+    Run a workload to completion and time it.
+
+    Keyword arguments:
+    path -- execution path name (str)
+    name -- workload name (str)
+
+    Return: tuple of (instructions executed, seconds, last result code) (tuple)
+    """
+    cpu = create_cpu(path)
+    load_workload(cpu, name)
+    start = time.perf_counter()
+    result, executed = cpu.run(MAX_INSTRUCTIONS)
+    elapsed = time.perf_counter() - start
+    return executed, elapsed, result
+
+
+def measure_assembly(path, name, repeat):
+    """
+    Time repeated assembly of a workload into a CPU.
+
+    Keyword arguments:
+    path -- execution path name (str)
+    name -- workload name (str)
+    repeat -- number of times to assemble the source (int)
+
+    Return: assembly lines per second (float)
+    """
+    asm = assembler.assembler()
+    with open(workload_source(name), 'r') as f:
+        lines = sum(1 for line in f if asm.parse_line(line))
+    cpu = create_cpu(path)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        asm.assemble(workload_source(name), 0x0000, cpu=cpu)
+    elapsed = time.perf_counter() - start
+    return lines * repeat / elapsed
+
+
+def measure_memory_load(path, size=0x10000):
+    """
+    Time byte-by-byte loading of an image into memory.
+
+    Keyword arguments:
+    path -- execution path name (str)
+    size -- number of bytes to load (default 0x10000)
+
+    Return: bytes loaded per second (float)
+    """
+    cpu = create_cpu(path)
+    image = bytes(random.Random(0).getrandbits(8) for _ in range(size))
+    start = time.perf_counter()
+    for address, value in enumerate(image):
+        cpu.write_memory(address, value)
+    elapsed = time.perf_counter() - start
+    return size / elapsed
+
+
+def measure_hex_load(path, size=0x10000):
+    """
+    Time parsing and loading of an Intel HEX image into memory.
+
+    Keyword arguments:
+    path -- execution path name (str)
+    size -- number of bytes in the image (default 0x10000)
+
+    Return: bytes loaded per second (float)
+    """
+    cpu = create_cpu(path)
+    image = bytes(random.Random(0).getrandbits(8) for _ in range(size))
+    text = objformat.encode_intel_hex(image, 0)
+    start = time.perf_counter()
+    blocks, _ = objformat.parse_intel_hex(text)
+    objformat.load_blocks(cpu, blocks)
+    elapsed = time.perf_counter() - start
+    return size / elapsed
+
+
+def run_benchmarks(paths, workloads, repeat=3):
+    """
+    Benchmark every workload on every execution path.
+
+    Keyword arguments:
+    paths -- execution path names to benchmark (list)
+    workloads -- workload names to run (list)
+    repeat -- runs per measurement, the fastest run is kept (default 3)
+
+    Return: benchmark results keyed by path (dict)
+    """
+    results = {}
+    for path in paths:
+        path_results = {
+            'memory_load_bytes_per_sec': max(measure_memory_load(path) for _ in range(repeat)),
+            'hex_load_bytes_per_sec': max(measure_hex_load(path) for _ in range(repeat)),
+            'workloads': {},
+        }
+        for name in workloads:
+            runs = [measure_execution(path, name) for _ in range(repeat)]
+            executed, elapsed, result = min(runs, key=lambda run: run[1])
+            path_results['workloads'][name] = {
+                'instructions': executed,
+                'seconds': elapsed,
+                'result': result,
+                'instructions_per_sec': executed / elapsed,
+                'assembly_lines_per_sec': measure_assembly(path, name, repeat * 10),
+            }
+        results[path] = path_results
+    return results
+
+
+def print_results(results):
+    """
+    Print benchmark results as a table.
+
+    Keyword arguments:
+    results -- benchmark results as returned by run_benchmarks (dict)
+
+    Return: None
+    """
+    print(f"{'path':<10} {'workload':<10} {'instr':>9} {'instr/s':>12} {'asm lines/s':>12} {'result':>6}")
+    for path, path_results in results.items():
+        for name, workload in path_results['workloads'].items():
+            print(f"{path:<10} {name:<10} {workload['instructions']:>9} "
+                  f"{workload['instructions_per_sec']:>12.0f} "
+                  f"{workload['assembly_lines_per_sec']:>12.0f} {workload['result']:>6}")
+        print(f"{path:<10} {'memload':<10} {'':>9} {path_results['memory_load_bytes_per_sec']:>12.0f} bytes/s")
+        print(f"{path:<10} {'hexload':<10} {'':>9} {path_results['hex_load_bytes_per_sec']:>12.0f} bytes/s")
+
+
+def compare_results(current, baseline, tolerance):
+    """
+    Compare benchmark results against a baseline.
+
+    Keyword arguments:
+    current -- benchmark results of this run (dict)
+    baseline -- benchmark results loaded from a previous run (dict)
+    tolerance -- allowed relative slowdown before flagging a regression (float)
+
+    Return: list of regression descriptions (list)
+    """
+    regressions = []
+
+    def check(label, new, old):
+        if old and new < old * (1 - tolerance):
+            regressions.append(f"{label}: {new:.0f} vs baseline {old:.0f} ({new / old - 1:+.1%})")
+
+    for path, path_results in current.items():
+        if path not in baseline:
+            continue
+        old_path = baseline[path]
+        check(f"{path} memory load", path_results['memory_load_bytes_per_sec'],
+              old_path.get('memory_load_bytes_per_sec'))
+        check(f"{path} hex load", path_results['hex_load_bytes_per_sec'],
+              old_path.get('hex_load_bytes_per_sec'))
+        for name, workload in path_results['workloads'].items():
+            old = old_path.get('workloads', {}).get(name)
+            if not old:
+                continue
+            if workload['instructions'] != old['instructions']:
+                regressions.append(f"{path} {name}: executed {workload['instructions']} instructions, "
+                                   f"baseline executed {old['instructions']}")
+            check(f"{path} {name} instructions/sec", workload['instructions_per_sec'],
+                  old['instructions_per_sec'])
+            check(f"{path} {name} assembly lines/sec", workload['assembly_lines_per_sec'],
+                  old['assembly_lines_per_sec'])
+    return regressions
+
+
+def capture_state(cpu):
+    """
+    Capture the architectural state of a CPU.
+
+    Keyword arguments:
+    cpu -- CPU8085 object to inspect (CPU8085)
+
+    Return: registers, flags, PC, SP, T-state count and the full memory image (dict)
+    """
+    state = cpu.get_register_state()
+    state['cycles'] = cpu.get_cycles()
+    state['memory'] = cpu.memory.read_block(0, 0x10000)
+    return state
+
+
+def diff_states(expected, actual):
+    """
+    Describe the differences between two captured CPU states.
+
+    Keyword arguments:
+    expected -- state of the reference path (dict)
+    actual -- state of the path under test (dict)
+
+    Return: list of difference descriptions (list)
+    """
+    differences = []
+    for field in py85.REGISTER_NAMES + ['flags', 'PC', 'SP', 'cycles']:
+        if expected[field] != actual[field]:
+            differences.append(f"{field} {expected[field]:#x} != {actual[field]:#x}")
+    if expected['memory'] != actual['memory']:
+        for address, (old, new) in enumerate(zip(expected['memory'], actual['memory'])):
+            if old != new:
+                differences.append(f"memory[{address:#06x}] {old:#04x} != {new:#04x}")
+                break
+    return differences
+
+
+def check_workload_conformance(paths, name):
+    """
+    Run a workload on every path in lockstep, comparing state after each instruction.
+
+    Keyword arguments:
+    paths -- execution path names, the first one is the reference (list)
+    name -- workload name (str)
+
+    Return: list of divergence descriptions, stopping at the first divergent step (list)
+    """
+    cpus = [create_cpu(path) for path in paths]
+    for cpu in cpus:
+        load_workload(cpu, name)
+    for step in range(MAX_INSTRUCTIONS):
+        pc = cpus[0].get_PC()
+        opcode = cpus[0].read_memory(pc)
+        results = [cpu.executor.execute_instruction() for cpu in cpus]
+        states = [capture_state(cpu) for cpu in cpus]
+        divergences = []
+        for path, result, state in zip(paths[1:], results[1:], states[1:]):
+            differences = diff_states(states[0], state)
+            if result != results[0]:
+                differences.insert(0, f"result {results[0]} != {result}")
+            if differences:
+                divergences.append(f"{name} step {step} PC {pc:#06x} opcode {opcode:#04x} "
+                                   f"{paths[0]} vs {path}: " + ', '.join(differences))
+        if divergences or results[0] != py85.RESULT_CONTINUE:
+            return divergences
+    return []
+
+
+def check_fast_forward_conformance(paths, name, budgets=(MAX_INSTRUCTIONS, 1000, 4099)):
+    """
+    Run a workload with delay loop fast-forwarding on and off, comparing the final
+    states and edge coverage maps.
+
+    Keyword arguments:
+    paths -- execution path names, the first one is the reference (list)
+    name -- workload name (str)
+    budgets -- instruction budgets to stop at, exercising loops cut short by the budget (tuple)
+
+    Return: list of divergence descriptions (list)
+    """
+    divergences = []
+    for budget in budgets:
+        outcomes = []
+        for path in paths:
+            for fast_forward in (False, True):
+                cpu = create_cpu(path)
+                cpu.executor.set_fast_forward(fast_forward)
+                cpu.executor.enable_coverage()
+                load_workload(cpu, name)
+                result, executed = cpu.run(budget)
+                state = capture_state(cpu)
+                state['coverage'] = cpu.executor.read_coverage()
+                outcomes.append((f"{path} fast-forward {'on' if fast_forward else 'off'}",
+                                 result, executed, state))
+        label, result, executed, state = outcomes[0]
+        for other_label, other_result, other_executed, other_state in outcomes[1:]:
+            differences = diff_states(state, other_state)
+            if (other_result, other_executed) != (result, executed):
+                differences.insert(0, f"result {result} after {executed} != {other_result} after {other_executed}")
+            if other_state['coverage'] != state['coverage']:
+                differences.append("edge coverage differs")
+            if differences:
+                divergences.append(f"{name} budget {budget} {label} vs {other_label}: " + ', '.join(differences))
+    return divergences
+
+
+def check_time_travel_conformance(paths, name, forward=500, back=100):
+    """
+    Run a workload forward under time travel, step back and compare with a run that
+    stopped at the same position. Stepping back is done once through the journal and
+    once through checkpoint replay.
+
+    Keyword arguments:
+    paths -- execution path names (list)
+    name -- workload name (str)
+    forward -- instructions executed before stepping back (default 500)
+    back -- instructions stepped back (default 100)
+
+    Return: list of divergence descriptions (list)
+    """
+    divergences = []
+    for path in paths:
+        reference = create_cpu(path)
+        load_workload(reference, name)
+        reference.run(forward - back)
+        expected = capture_state(reference)
+        for label, journal_size in (('journal', forward), ('checkpoint', back // 2)):
+            cpu = create_cpu(path)
+            load_workload(cpu, name)
+            debugger = timetravel.TimeTravel(cpu, checkpoint_interval=64, journal_size=journal_size)
+            try:
+                debugger.run(forward)
+                debugger.step_back(back)
+            except (RuntimeError, ValueError) as e:
+                divergences.append(f"{name} {path} step back through {label}: {e}")
+                continue
+            differences = diff_states(expected, capture_state(cpu))
+            if debugger.position != forward - back:
+                differences.insert(0, f"position {forward - back} != {debugger.position}")
+            if differences:
+                divergences.append(f"{name} {path} step back through {label}: " + ', '.join(differences))
+        divergences += check_run_back_to(path, name, forward)
+    return divergences
+
+
+def check_run_back_to(path, name, forward, max_checkpoints=4):
+    """
+    Run a workload forward under time travel with few checkpoints, so older history is
+    evicted, then run back to the entry point with a journal reaching past the oldest
+    checkpoint and to a program counter executed halfway through the reachable history
+    with a short journal, so the search replays checkpoints. Both are compared with
+    uninterrupted runs.
+
+    Keyword arguments:
+    path -- execution path name (str)
+    name -- workload name (str)
+    forward -- instructions executed before running back (int)
+    max_checkpoints -- checkpoints kept by the time travel debugger (default 4)
+
+    Return: list of divergence descriptions (list)
+    """
+    tracer = create_cpu(path)
+    load_workload(tracer, name)
+    pcs = []
+    while len(pcs) < forward:
+        pc = tracer.get_PC()
+        if tracer.executor.execute_instruction() != py85.RESULT_CONTINUE:
+            break
+        pcs.append(pc)
+
+    divergences = []
+    for label, journal_size in (('entry', forward), ('halfway', 32)):
+        cpu = create_cpu(path)
+        load_workload(cpu, name)
+        debugger = timetravel.TimeTravel(cpu, checkpoint_interval=64, max_checkpoints=max_checkpoints,
+                                         journal_size=journal_size)
+        debugger.run(forward)
+        oldest = debugger.oldest_position()
+        target = pcs[0] if label == 'entry' else pcs[(oldest + len(pcs)) // 2]
+        reachable = [position for position in range(oldest, len(pcs)) if pcs[position] == target]
+        expected_position = reachable[-1] if reachable else None
+        try:
+            position = debugger.run_back_to(target)
+        except (RuntimeError, ValueError) as e:
+            divergences.append(f"{name} {path} run back to {label} {target:#06x}: {e}")
+            continue
+        reference = create_cpu(path)
+        load_workload(reference, name)
+        reference.run(len(pcs) if expected_position is None else expected_position)
+        differences = diff_states(capture_state(reference), capture_state(cpu))
+        if position != expected_position:
+            differences.insert(0, f"position {expected_position} != {position}")
+        if differences:
+            divergences.append(f"{name} {path} run back to {label} {target:#06x}: " + ', '.join(differences))
+    return divergences
+
+
+def _hex_line(record_type, address, data):
+    """
+    Format an Intel HEX record without checking that it makes sense.
+
+    Keyword arguments:
+    record_type -- record type byte (int)
+    address -- 16-bit record address (int)
+    data -- record payload (bytes)
+
+    Return: the record line (str)
+    """
+    return objformat._record(record_type, address, data)
+
+
+# Malformed Intel HEX texts, each followed by an EOF record, and the line its error names
+MALFORMED_HEX = [
+    ('missing colon', '00000001FF', 1),
+    ('invalid hex digits', ':0G000001FF', 1),
+    ('length mismatch', ':0200000001FD', 1),
+    ('checksum mismatch', ':0100000000FE', 1),
+    ('data past 64 KB', _hex_line(objformat.RECORD_DATA, 0xFFFF, b'\x00\x00'), 1),
+    ('unknown record type', _hex_line(0x06, 0, b''), 1),
+    ('short extended segment address', _hex_line(objformat.RECORD_EXTENDED_SEGMENT, 0, b''), 1),
+    ('short extended linear address', _hex_line(objformat.RECORD_EXTENDED_LINEAR, 0, b'\x00'), 1),
+    ('short start segment address', _hex_line(objformat.RECORD_START_SEGMENT, 0, b'\x00\x00'), 1),
+    ('long start linear address', _hex_line(objformat.RECORD_START_LINEAR, 0, bytes(5)), 1),
+    ('error after a valid record', _hex_line(objformat.RECORD_DATA, 0, b'\x01') + '\n:0100000000FE', 2),
+]
+
+
+def check_object_formats(paths, seed=0):
+    """
+    Check Intel HEX and raw binary images: encode/parse round trips, address and start
+    records, rejection of malformed records and overlapping images, and assembled images
+    loading into every path as assembling into memory does.
+
+    Keyword arguments:
+    paths -- execution path names (list)
+    seed -- seed of the random image contents (default 0)
+
+    Return: list of divergence descriptions (list)
+    """
+    rng = random.Random(seed)
+    divergences = []
+    for origin, size, record_size in ((0x0000, 1, 16), (0x0800, 300, 16), (0x1234, 1000, 32), (0xFF00, 256, 255)):
+        data = bytes(rng.getrandbits(8) for _ in range(size))
+        blocks, start = objformat.parse_intel_hex(objformat.encode_intel_hex(data, origin, record_size))
+        if (blocks, start) != ([(origin, data)], None):
+            divergences.append(f"object round trip of {size} bytes at {origin:#06x} differs")
+
+    text = '\n'.join([
+        _hex_line(objformat.RECORD_EXTENDED_LINEAR, 0, b'\x00\x00'),
+        _hex_line(objformat.RECORD_EXTENDED_SEGMENT, 0, b'\x01\x00'),
+        _hex_line(objformat.RECORD_DATA, 0x0010, b'\xAA\xBB'),
+        _hex_line(objformat.RECORD_START_LINEAR, 0, b'\x00\x00\x08\x00'),
+        _hex_line(objformat.RECORD_EOF, 0, b''),
+    ])
+    parsed = objformat.parse_intel_hex(text)
+    if parsed != ([(0x1010, b'\xAA\xBB')], 0x0800):
+        divergences.append(f"object address and start records parsed as {parsed}")
+
+    eof = _hex_line(objformat.RECORD_EOF, 0, b'')
+    for label, text, line_num in MALFORMED_HEX + [('missing end of file record', None, None)]:
+        text = _hex_line(objformat.RECORD_DATA, 0, b'\x01') if text is None else text + '\n' + eof
+        try:
+            objformat.parse_intel_hex(text)
+        except ValueError as e:
+            if line_num is not None and f"line {line_num}" not in str(e):
+                divergences.append(f"object {label}: error does not name line {line_num}: {e}")
+        except Exception as e:
+            divergences.append(f"object {label}: {type(e).__name__} instead of ValueError: {e}")
+        else:
+            divergences.append(f"object {label}: accepted")
+
+    with tempfile.TemporaryDirectory() as directory:
+        first = os.path.join(directory, 'first.bin')
+        second = os.path.join(directory, 'second.bin')
+        for filename in (first, second):
+            with open(filename, 'wb') as f:
+                f.write(bytes(0x100))
+        cpu = create_cpu(paths[0])
+        try:
+            objformat.load_images(cpu, [(first, 0x1000), (second, 0x10FF)])
+        except ValueError:
+            pass
+        else:
+            divergences.append("object overlapping images accepted")
+        try:
+            objformat.load_images(cpu, [(first, 0x1000), (second, 0x1100)])
+        except ValueError as e:
+            divergences.append(f"object adjacent images rejected: {e}")
+
+        hex_file = os.path.join(directory, 'workload.hex')
+        bin_file = os.path.join(directory, 'workload.bin')
+        asm = assembler.assembler()
+        asm.assemble_to_hex(workload_source('memcpy'), 0x0800, hex_file)
+        asm.assemble_to_binary(workload_source('memcpy'), bin_file)
+        for path in paths:
+            reference = create_cpu(path)
+            asm.assemble(workload_source('memcpy'), 0x0800, cpu=reference)
+            expected = reference.memory.read_block(0, py85.MEMORY_SIZE)
+            code = expected[0x0800:0x0800 + os.path.getsize(bin_file)]
+            for label, images in (('hex', [(hex_file, 0)]), ('binary', [(bin_file, 0x0800)]),
+                                  ('hex at an offset', [(hex_file, -0x0800), (bin_file, 0x0800)])):
+                cpu = create_cpu(path)
+                try:
+                    objformat.load_images(cpu, images)
+                except ValueError as e:
+                    divergences.append(f"object {path} {label} image: {e}")
+                    continue
+                if label == 'hex at an offset':
+                    # The HEX copy moves down to 0000H, the binary copy stays at 0800H
+                    expected_image = bytearray(expected)
+                    expected_image[:len(code)] = code
+                else:
+                    expected_image = expected
+                if cpu.memory.read_block(0, py85.MEMORY_SIZE) != expected_image:
+                    divergences.append(f"object {path} {label} image loads differently from assembling")
+    return divergences
+
+
+# Reads two bytes from port 1, writes their sum to port 2 and 3000H, then halts
+PORT_PROGRAM = bytes([0xDB, 0x01, 0x47, 0xDB, 0x01, 0x80, 0xD3, 0x02, 0x32, 0x00, 0x30, 0x76])
+
+
+def load_port_program(cpu, data, device_class=devices.InputDevice):
+    """
+    Load PORT_PROGRAM with an input device on port 1 and an output device on port 2.
+
+    Keyword arguments:
+    cpu -- CPU8085 object to load (CPU8085)
+    data -- bytes fed to the input device (bytes)
+    device_class -- class of the port 1 device, InputDevice or RandomDevice (default devices.InputDevice)
+
+    Return: tuple of (input device, output device) (tuple)
+    """
+    cpu.write_block(0, PORT_PROGRAM)
+    source = device_class(data) if device_class is devices.InputDevice else device_class()
+    sink = devices.OutputDevice()
+    cpu.attach_device(1, source)
+    cpu.attach_device(2, sink)
+    return source, sink
+
+
+def check_cache_conformance(paths):
+    """
+    Run workloads and a port program through the result cache and compare with uncached
+    runs: misses and hits, hits served from the disk tier, LRU eviction, the port accesses
+    replayed into the devices and runs on a nondeterministic device never being stored.
+
+    Keyword arguments:
+    paths -- execution path names (list)
+
+    Return: list of divergence descriptions (list)
+    """
+    divergences = []
+    for path in paths:
+        def fail(label, details):
+            divergences.append(f"cache {path} {label}: " + ', '.join(details))
+
+        def expect_stats(label, results, **expected):
+            stats = results.stats()
+            details = [f"{field} {value} != {stats[field]}" for field, value in expected.items()
+                       if stats[field] != value]
+            if details:
+                fail(label, details)
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = cache.ResultCache(max_entries=1, directory=directory)
+            for name in ('muldiv', 'memcpy'):
+                reference = create_cpu(path)
+                load_workload(reference, name)
+                expected_outcome = reference.run(MAX_INSTRUCTIONS)
+                expected = capture_state(reference)
+                for label in ('miss', 'hit'):
+                    cpu = create_cpu(path)
+                    load_workload(cpu, name)
+                    outcome = cpu.run(MAX_INSTRUCTIONS, cache=results)
+                    differences = diff_states(expected, capture_state(cpu))
+                    if outcome != expected_outcome:
+                        differences.insert(0, f"result {expected_outcome} != {outcome}")
+                    if differences:
+                        fail(f"{name} {label}", differences)
+            # max_entries=1: memcpy evicted muldiv from memory, so muldiv comes back from disk
+            expect_stats("LRU eviction", results, hits=2, disk_hits=0, misses=2, evictions=1, entries=1)
+            cpu = create_cpu(path)
+            load_workload(cpu, 'muldiv')
+            cpu.run(MAX_INSTRUCTIONS, cache=results)
+            expect_stats("disk tier", results, hits=3, disk_hits=1, misses=2, evictions=2)
+
+        results = cache.ResultCache()
+        reference = create_cpu(path)
+        _, reference_sink = load_port_program(reference, b'\x12\x34\x56')
+        reference.run(MAX_INSTRUCTIONS)
+        expected = capture_state(reference)
+        for label in ('miss', 'hit'):
+            cpu = create_cpu(path)
+            source, sink = load_port_program(cpu, b'\x12\x34\x56')
+            cpu.run(MAX_INSTRUCTIONS, cache=results)
+            differences = diff_states(expected, capture_state(cpu))
+            if sink.output != reference_sink.output:
+                differences.append(f"output {reference_sink.output.hex()} != {sink.output.hex()}")
+            if source.state() != (b'\x56', 0xFF):
+                differences.append(f"input left {source.state()[0].hex()} != 56")
+            if differences:
+                fail(f"port replay {label}", differences)
+        expect_stats("port replay", results, hits=1, misses=1)
+
+        results = cache.ResultCache()
+        for _ in range(2):
+            cpu = create_cpu(path)
+            load_port_program(cpu, b'', devices.RandomDevice)
+            cpu.run(MAX_INSTRUCTIONS, cache=results)
+        expect_stats("nondeterministic device", results, hits=0, misses=2, uncacheable=2, entries=0)
+    return divergences
+
+
+def randomize_state(cpus, opcode, rng):
+    """
+    Put every CPU into the same random state with the opcode at PC.
+
+    Keyword arguments:
+    cpus -- CPU8085 objects to initialize (list)
+    opcode -- opcode placed at PC (int)
+    rng -- random.Random instance driving the state (random.Random)
+
+    Return: None
+    """
+    registers = {name: rng.getrandbits(8) for name in py85.REGISTER_NAMES}
+    flags = rng.getrandbits(8)
+    pc = rng.randrange(0x0100, 0x7F00)
+    sp = rng.randrange(0x8000, 0xF000)
+    operands = [rng.getrandbits(8), rng.getrandbits(8)]
+    operand_address = operands[0] | (operands[1] << 8)
+    pairs = [(registers['B'] << 8) | registers['C'], (registers['D'] << 8) | registers['E'],
+             (registers['H'] << 8) | registers['L'], sp, operand_address]
+    memory = {}
+    for base in pairs:
+        memory[base] = rng.getrandbits(8)
+        memory[(base + 1) & 0xFFFF] = rng.getrandbits(8)
+    memory[pc] = opcode
+    memory[(pc + 1) & 0xFFFF] = operands[0]
+    memory[(pc + 2) & 0xFFFF] = operands[1]
+    for cpu in cpus:
+        for name, value in registers.items():
+            cpu.write_register(name, value)
+        cpu.set_flags(flags)
+        cpu.set_PC(pc)
+        cpu.set_SP(sp)
+        for address, value in memory.items():
+            cpu.write_memory(address, value)
+
+
+def check_opcode_conformance(paths, trials=8, seed=0):
+    """
+    Execute every opcode from randomized initial states on every path and compare.
+
+    Keyword arguments:
+    paths -- execution path names, the first one is the reference (list)
+    trials -- random initial states per opcode (default 8)
+    seed -- seed of the random state generator (default 0)
+
+    Return: list of divergence descriptions (list)
+    """
+    rng = random.Random(seed)
+    divergences = []
+    for opcode in range(256):
+        for trial in range(trials):
+            cpus = [create_cpu(path) for path in paths]
+            randomize_state(cpus, opcode, rng)
+            results = [cpu.executor.execute_instruction() for cpu in cpus]
+            states = [capture_state(cpu) for cpu in cpus]
+            for path, result, state in zip(paths[1:], results[1:], states[1:]):
+                differences = diff_states(states[0], state)
+                if result != results[0]:
+                    differences.insert(0, f"result {results[0]} != {result}")
+                if differences:
+                    divergences.append(f"opcode {opcode:#04x} trial {trial} {paths[0]} vs {path}: "
+                                       + ', '.join(differences))
+    return divergences
+
+
+def default_paths():
+    """
+    List the execution paths available in this process, reference first.
+
+    Keyword arguments:
+    None --
+
+    Return: backend names (list)
+    """
+    paths = py85.available_backends()
+    return sorted(paths, key=lambda path: path != REFERENCE_PATH)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paths', nargs='+', choices=py85.BACKEND_ORDER, default=None,
+                        help='execution paths to run, the first one is the conformance reference '
+                             '(default: every available backend)')
+    parser.add_argument('--workloads', nargs='+', choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement')
+    parser.add_argument('--json', help='write benchmark results to this JSON file')
+    parser.add_argument('--compare', help='compare against benchmark results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='relative slowdown tolerated by --compare (default 0.10)')
+    parser.add_argument('--conformance', action='store_true', help='run the conformance checks instead')
+    parser.add_argument('--trials', type=int, default=8, help='random states per opcode in conformance mode')
+    parser.add_argument('--seed', type=int, default=0, help='seed for conformance mode')
+    args = parser.parse_args(argv)
+    if args.paths is None:
+        args.paths = default_paths()
+
+    if args.conformance:
+        divergences = []
+        for name in args.workloads:
+            divergences += check_workload_conformance(args.paths, name)
+            divergences += check_fast_forward_conformance(args.paths, name)
+            divergences += check_time_travel_conformance(args.paths, name)
+        divergences += check_cache_conformance(args.paths)
+        divergences += check_object_formats(args.paths, args.seed)
+        divergences += check_opcode_conformance(args.paths, args.trials, args.seed)
+        for divergence in divergences:
+            print(divergence)
+        print(f"{len(divergences)} divergences across paths {', '.join(args.paths)}")
+        return 1 if divergences else 0
+
+    results = run_benchmarks(args.paths, args.workloads, args.repeat)
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'timestamp': time.time(),
+                },
+                'results': results,
+            }, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare_results(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+; BCD counter: increment a 4-digit BCD number in HL 1000 times using DAA
+LXI H, 0000H        ; 0000 BCD counter
+LXI D, 03E8H        ; 0003 iterations
+MOV A, L            ; 0006
+ADI 01H             ; 0007
+DAA                 ; 0009
+MOV L, A            ; 000A
+MOV A, H            ; 000B
+ACI 00H             ; 000C
+DAA                 ; 000E
+MOV H, A            ; 000F
+DCX D               ; 0010
+MOV A, D            ; 0011
+ORA E               ; 0012
+JNZ 0006H           ; 0013
+SHLD 3000H          ; 0016 store result
+HLT                 ; 0019
@@ -0,0 +1,16 @@
+; Software delay loops: nested 8-bit DCR/JNZ countdowns and a 16-bit DCX/MOV/ORA/JNZ countdown, 2 passes
+MVI D, 02H          ; 0000 passes
+MVI B, 10H          ; 0002 outer count
+MVI C, 00H          ; 0004 inner count (256)
+DCR C               ; 0006
+JNZ 0006H           ; 0007
+DCR B               ; 000A
+JNZ 0004H           ; 000B
+LXI H, 0400H        ; 000E 16-bit count
+DCX H               ; 0011
+MOV A, H            ; 0012
+ORA L               ; 0013
+JNZ 0011H           ; 0014
+DCR D               ; 0017
+JNZ 0002H           ; 0018
+HLT                 ; 001B
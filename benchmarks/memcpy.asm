@@ -0,0 +1,14 @@
+; Memory copy: 8 passes copying 256 bytes from 1000H to 2000H
+MVI B, 08H          ; 0000 passes
+LXI H, 1000H        ; 0002 source
+LXI D, 2000H        ; 0005 destination
+MVI C, 00H          ; 0008 256 bytes per pass
+MOV A, M            ; 000A
+STAX D              ; 000B
+INX H               ; 000C
+INX D               ; 000D
+DCR C               ; 000E
+JNZ 000AH           ; 000F
+DCR B               ; 0012
+JNZ 0002H           ; 0013
+HLT                 ; 0016
@@ -0,0 +1,22 @@
+; Multiply by repeated DAD (200 * 100) and divide by repeated SUI (250 / 7), 64 passes
+MVI B, 40H          ; 0000 passes
+LXI H, 0000H        ; 0002 product
+LXI D, 00C8H        ; 0005 multiplicand
+MVI C, 64H          ; 0008 multiplier
+DAD D               ; 000A
+DCR C               ; 000B
+JNZ 000AH           ; 000C
+SHLD 3000H          ; 000F store product
+MVI A, FAH          ; 0012 dividend
+MVI C, 00H          ; 0014 quotient
+SUI 07H             ; 0016 divisor
+JC 001FH            ; 0018
+INR C               ; 001B
+JMP 0016H           ; 001C
+ADI 07H             ; 001F restore remainder
+STA 3002H           ; 0021
+MOV A, C            ; 0024
+STA 3003H           ; 0025
+DCR B               ; 0028
+JNZ 0002H           ; 0029
+HLT                 ; 002C
@@ -0,0 +1,17 @@
+; PUSH/POP storm: push four pairs and pop them back rotated, 256 passes
+LXI SP, F000H       ; 0000
+LXI B, 1234H        ; 0003
+LXI D, 5678H        ; 0006
+LXI H, 9ABCH        ; 0009
+MVI A, 00H          ; 000C 256 passes
+PUSH B              ; 000E
+PUSH D              ; 000F
+PUSH H              ; 0010
+PUSH PSW            ; 0011
+POP PSW             ; 0012
+POP B               ; 0013
+POP H               ; 0014
+POP D               ; 0015
+DCR A               ; 0016
+JNZ 000EH           ; 0017
+HLT                 ; 001A
@@ -0,0 +1,18 @@
+; Recursive sum of 1..64 through nested CALL/RET, 32 passes
+LXI SP, F000H       ; 0000
+MVI B, 20H          ; 0003 passes
+MVI C, 40H          ; 0005 recursion depth
+LXI H, 0000H        ; 0007 sum
+CALL 0012H          ; 000A
+DCR B               ; 000D
+JNZ 0005H           ; 000E
+HLT                 ; 0011
+MOV A, C            ; 0012 SUM: return when C is zero
+ORA A               ; 0013
+RZ                  ; 0014
+MOV E, C            ; 0015
+MVI D, 00H          ; 0016
+DAD D               ; 0018
+DCR C               ; 0019
+CALL 0012H          ; 001A
+RET                 ; 001D
@@ -0,0 +1,243 @@
+"""Memoized headless runs of CPU8085 programs.
+
+A run is keyed by a hash of the whole memory image, the registers, the state
+of the attached deterministic devices and the instruction budget. The cached
+result holds the final registers, the memory pages the run changed, the
+T-states it took, its port accesses and its stop reason, so a hit leaves the
+CPU and its devices exactly as running the program would have. Runs that
+touched a nondeterministic device are never cached.
+
+    cache = ResultCache(max_entries=1024, directory='run-cache')
+    result, executed = cpu.run(100000, cache=cache)
+"""
+import collections
+import hashlib
+import json
+import os
+import tempfile
+
+import py8085 as py85
+
+
+class ResultCache:
+    """LRU cache of run results with an optional on-disk tier."""
+
+    def __init__(self, max_entries=256, directory=None):
+        """
+        Initialize a ResultCache object.
+
+        Keyword arguments:
+        max_entries -- results kept in memory before the least recently used is evicted (default 256)
+        directory -- directory holding one JSON file per result, None for memory only (default None)
+
+        Return: None
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.evictions = 0
+
+    def key(self, cpu, max_instructions, image=None):
+        """
+        Compute the cache key of running a CPU from its current state.
+
+        Keyword arguments:
+        cpu -- CPU8085 object about to run (CPU8085)
+        max_instructions -- instruction budget of the run, None for no limit (int)
+        image -- the full memory image if already read (default None)
+
+        Return: hex digest (str)
+        """
+        if image is None:
+            image = cpu.memory.read_block(0, py85.MEMORY_SIZE)
+        state = cpu.get_register_state()
+        digest = hashlib.sha256(image)
+        digest.update(repr([state[name] for name in py85.REGISTER_NAMES + ['flags', 'PC', 'SP']]).encode())
+        for port in sorted(cpu.devices):
+            device = cpu.devices[port]
+            device_type = type(device)
+            # Reading a nondeterministic device stops the run from being cached, so its state is irrelevant
+            device_state = device.state() if getattr(device, 'deterministic', False) else None
+            digest.update(repr((port, device_type.__module__, device_type.__qualname__, device_state)).encode())
+        digest.update(repr(max_instructions).encode())
+        return digest.hexdigest()
+
+    def run(self, cpu, max_instructions=None):
+        """
+        Run a CPU, reusing the stored result of an identical earlier run if there is one.
+
+        Keyword arguments:
+        cpu -- CPU8085 object to run (CPU8085)
+        max_instructions -- instruction budget, None for no limit (default None)
+
+        Return: tuple of (last result code, instructions executed) (tuple)
+        """
+        image = cpu.memory.read_block(0, py85.MEMORY_SIZE)
+        key = self.key(cpu, max_instructions, image)
+        entry = self.lookup(key)
+        if entry is not None:
+            self._apply(cpu, entry)
+            return entry['result'], entry['executed']
+
+        self.misses += 1
+        outer_log = cpu.io_log
+        cpu.io_log = []
+        cpu.nondeterministic_io = False
+        cycles = cpu.get_cycles()
+        try:
+            result, executed = cpu.run(max_instructions)
+        finally:
+            io_log = cpu.io_log
+            if outer_log is not None:
+                outer_log.extend(io_log)
+            cpu.io_log = outer_log
+        if cpu.nondeterministic_io:
+            self.uncacheable += 1
+            return result, executed
+
+        after = cpu.memory.read_block(0, py85.MEMORY_SIZE)
+        self.store(key, {
+            'result': result,
+            'executed': executed,
+            'registers': cpu.get_register_state(),
+            'cycles': cpu.get_cycles() - cycles,
+            'memory': _memory_diff(image, after),
+            'io': io_log,
+        })
+        return result, executed
+
+    def lookup(self, key):
+        """
+        Find a stored result, promoting results found on disk into memory.
+
+        Keyword arguments:
+        key -- cache key as returned by key (str)
+
+        Return: the stored result, None on a miss (dict)
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        entry = self._load(key)
+        if entry is not None:
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def store(self, key, entry):
+        """
+        Store a run result in memory and, if configured, on disk.
+
+        Keyword arguments:
+        key -- cache key as returned by key (str)
+        entry -- result with result, executed, registers, cycles, memory and io fields (dict)
+
+        Return: None
+        """
+        self._remember(key, entry)
+        if self.directory is None:
+            return
+        serialized = dict(entry, memory=[[address, data.hex()] for address, data in entry['memory']])
+        with tempfile.NamedTemporaryFile('w', dir=self.directory, suffix='.tmp', delete=False) as f:
+            json.dump(serialized, f)
+        os.replace(f.name, self._path(key))
+
+    def clear(self):
+        """
+        Drop every result kept in memory. Results on disk are kept.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        self.entries.clear()
+
+    def stats(self):
+        """
+        Get the hit/miss statistics.
+
+        Keyword arguments:
+        None --
+
+        Return: hits, disk hits, misses, uncacheable runs, evictions, entries and hit rate (dict)
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'uncacheable': self.uncacheable,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+            entry['memory'] = [(address, bytes.fromhex(data)) for address, data in entry['memory']]
+            entry['io'] = [tuple(access) for access in entry['io']]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or unreadable files are misses
+            return None
+        return entry
+
+    def _apply(self, cpu, entry):
+        for address, data in entry['memory']:
+            cpu.memory.write_block(address, data)
+        cpu.set_register_state(entry['registers'])
+        cpu.set_cycles(cpu.get_cycles() + entry['cycles'])
+        # Replay the port accesses so devices consume input and receive output as in the original run
+        for port, value in entry['io']:
+            if value is None:
+                cpu.read_port(port)
+            else:
+                cpu.write_port(port, value)
+
+
+def _memory_diff(before, after):
+    """
+    Find the memory pages that differ between two images, merged into contiguous runs.
+
+    Keyword arguments:
+    before -- memory image before the run (bytes)
+    after -- memory image after the run (bytes)
+
+    Return: list of (address, bytes) runs taken from after (list)
+    """
+    runs = []
+    start = None
+    for page in range(py85.PAGE_COUNT + 1):
+        offset = page * py85.PAGE_SIZE
+        changed = page < py85.PAGE_COUNT and before[offset:offset + py85.PAGE_SIZE] != after[offset:offset + py85.PAGE_SIZE]
+        if changed and start is None:
+            start = offset
+        elif not changed and start is not None:
+            runs.append((start, after[start:offset]))
+            start = None
+    return runs
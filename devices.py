@@ -0,0 +1,113 @@
+"""I/O devices that can be attached to the ports of a CPU8085 with attach_device.
+
+A device answers IN instructions through read(port) and receives OUT
+instructions through write(port, value). Devices whose reads depend only on
+their own state declare deterministic = True and describe that state with
+state(), which lets the result cache key runs on their inputs. Any other
+device is treated as nondeterministic.
+"""
+import collections
+import random
+
+
+class Device:
+    """Base class of port devices. Reads return 0xFF and writes are ignored."""
+
+    # True when reads depend only on state(), see the module docstring
+    deterministic = False
+
+    def read(self, port):
+        """
+        Answer an IN instruction.
+
+        Keyword arguments:
+        port -- port number being read (int)
+
+        Return: the byte read (int)
+        """
+        return 0xFF
+
+    def write(self, port, value):
+        """
+        Receive an OUT instruction.
+
+        Keyword arguments:
+        port -- port number being written (int)
+        value -- byte written (int)
+
+        Return: None
+        """
+
+    def state(self):
+        """
+        Describe everything future reads depend on.
+
+        Keyword arguments:
+        None --
+
+        Return: a value with a stable repr, e.g. bytes or a tuple (object)
+        """
+        return None
+
+
+class InputDevice(Device):
+    """Feeds a fixed sequence of bytes to IN, then reads as `default`."""
+
+    deterministic = True
+
+    def __init__(self, data=b'', default=0xFF):
+        """
+        Initialize an InputDevice object.
+
+        Keyword arguments:
+        data -- bytes returned by successive reads (bytes)
+        default -- value read once data is exhausted (default 0xFF)
+
+        Return: None
+        """
+        self.pending = collections.deque(data)
+        self.default = default
+
+    def read(self, port):
+        return self.pending.popleft() if self.pending else self.default
+
+    def state(self):
+        return bytes(self.pending), self.default
+
+
+class OutputDevice(Device):
+    """Collects the bytes written by OUT."""
+
+    deterministic = True
+
+    def __init__(self):
+        """
+        Initialize an OutputDevice object.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        self.output = bytearray()
+
+    def write(self, port, value):
+        self.output.append(value)
+
+
+class RandomDevice(Device):
+    """Reads return random bytes, e.g. a noise source. Nondeterministic."""
+
+    def __init__(self, rng=None):
+        """
+        Initialize a RandomDevice object.
+
+        Keyword arguments:
+        rng -- random.Random instance to draw from, None for a fresh one (default None)
+
+        Return: None
+        """
+        self.rng = rng or random.Random()
+
+    def read(self, port):
+        return self.rng.getrandbits(8)
@@ -1,6 +1,16 @@
 #include <stdint.h>
 #include <stdbool.h>
 #include <stdio.h>
+#include "export.h"
+#include "memory.h"
+#include "registers.h"
+
+// Thread local storage for the native accessors
+#ifdef _MSC_VER
+#define THREAD_LOCAL __declspec(thread)
+#else
+#define THREAD_LOCAL _Thread_local
+#endif
 
 // Function prototypes for memory access
 typedef uint8_t (*ReadMemoryFunc)(uint16_t address);
@@ -16,6 +26,10 @@ typedef void (*SetPCFunc)(uint16_t value);
 typedef uint16_t (*GetSPFunc)(void);
 typedef void (*SetSPFunc)(uint16_t value);
 
+// Function prototypes for I/O port access
+typedef uint8_t (*ReadPortFunc)(uint8_t port);
+typedef void (*WritePortFunc)(uint8_t port, uint8_t value);
+
 // Structure to hold all function pointers
 typedef struct {
     ReadMemoryFunc read_memory;
@@ -28,8 +42,21 @@ typedef struct {
     SetPCFunc set_pc;
     GetSPFunc get_sp;
     SetSPFunc set_sp;
+    uint32_t options;
+    uint32_t budget;    // instructions a single call may retire when fast-forwarding
+    uint32_t retired;   // instructions retired by the last call
+    uint64_t cycles;    // T-states executed so far
+    uint8_t* coverage;          // edge hit counters, NULL when coverage is off
+    uint32_t coverage_size;     // number of counters, a power of two
+    uint32_t coverage_prev;     // previous branch location, shifted right by one
+    ReadPortFunc read_port;     // IN handler, NULL leaves A unchanged
+    WritePortFunc write_port;   // OUT handler, NULL discards the value
 } CPU8085Functions;
 
+// Executor option bits
+#define OPT_TRACE 0x01
+#define OPT_FAST_FORWARD 0x02
+
 // Flag bit positions
 #define FLAG_S  0x80
 #define FLAG_Z  0x40
@@ -47,7 +74,32 @@ typedef struct {
 #define REG_M 6
 #define REG_A 7
 
-static void update_flags(CPU8085Functions* cpu, uint8_t result) {
+// T-states per opcode, 0 for unknown opcodes. Conditional branches hold their
+// not-taken cost, the *_TAKEN_EXTRA cycles are added when the branch is taken.
+static const uint8_t CYCLES[256] = {
+     4, 10,  7,  6,  4,  4,  7,  4,  0, 10,  7,  6,  4,  4,  7,  4,  // 00
+     0, 10,  7,  6,  4,  4,  7,  4,  0, 10,  7,  6,  4,  4,  7,  4,  // 10
+     4, 10, 16,  6,  4,  4,  7,  4,  0, 10, 16,  6,  4,  4,  7,  4,  // 20
+     4, 10, 13,  6, 10, 10, 10,  4,  0, 10, 13,  6,  4,  4,  7,  4,  // 30
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,  // 40
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,  // 50
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,  // 60
+     7,  7,  7,  7,  7,  7,  5,  7,  4,  4,  4,  4,  4,  4,  7,  4,  // 70
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,  // 80
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,  // 90
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,  // A0
+     4,  4,  4,  4,  4,  4,  7,  4,  4,  4,  4,  4,  4,  4,  7,  4,  // B0
+     6, 10,  7, 10,  9, 12,  7, 12,  6, 10,  7,  0,  9, 18,  7, 12,  // C0
+     6, 10,  7, 10,  9, 12,  7, 12,  6,  0,  7, 10,  9,  0,  7, 12,  // D0
+     6, 10,  7, 16,  9, 12,  7, 12,  6,  6,  7,  4,  9,  0,  7, 12,  // E0
+     6, 10,  7,  4,  9, 12,  7, 12,  6,  6,  7,  4,  9,  0,  7, 12,  // F0
+};
+
+#define JUMP_TAKEN_EXTRA 3
+#define CALL_TAKEN_EXTRA 9
+#define RETURN_TAKEN_EXTRA 6
+
+static uint8_t szp_flags(uint8_t result) {
     uint8_t flags = 0;
 
     // Sign flag
@@ -63,39 +115,263 @@ static void update_flags(CPU8085Functions* cpu, uint8_t result) {
     parity ^= parity >> 1;
     if (~parity & 1) flags |= FLAG_P;
 
+    return flags;
+}
+
+// Sets S, Z and P from the result and clears CY and AC (XRA/ORA semantics)
+static void update_flags(CPU8085Functions* cpu, uint8_t result) {
+    cpu->set_flags(szp_flags(result));
+}
+
+// Register pair access: 0 = BC, 1 = DE, 2 = HL, 3 = SP
+static uint16_t read_pair(CPU8085Functions* cpu, uint8_t rp) {
+    switch (rp) {
+        case 0: return ((uint16_t)cpu->read_reg(REG_B) << 8) | cpu->read_reg(REG_C);
+        case 1: return ((uint16_t)cpu->read_reg(REG_D) << 8) | cpu->read_reg(REG_E);
+        case 2: return ((uint16_t)cpu->read_reg(REG_H) << 8) | cpu->read_reg(REG_L);
+        default: return cpu->get_sp();
+    }
+}
+
+static void write_pair(CPU8085Functions* cpu, uint8_t rp, uint16_t value) {
+    switch (rp) {
+        case 0:
+            cpu->write_reg(REG_B, value >> 8);
+            cpu->write_reg(REG_C, value & 0xFF);
+            break;
+        case 1:
+            cpu->write_reg(REG_D, value >> 8);
+            cpu->write_reg(REG_E, value & 0xFF);
+            break;
+        case 2:
+            cpu->write_reg(REG_H, value >> 8);
+            cpu->write_reg(REG_L, value & 0xFF);
+            break;
+        default:
+            cpu->set_sp(value);
+            break;
+    }
+}
+
+// Register operand access, where M is the memory byte addressed by HL
+static uint8_t read_operand(CPU8085Functions* cpu, uint8_t reg) {
+    if (reg == REG_M) {
+        return cpu->read_memory(read_pair(cpu, 2));
+    }
+    return cpu->read_reg(reg);
+}
+
+static void write_operand(CPU8085Functions* cpu, uint8_t reg, uint8_t value) {
+    if (reg == REG_M) {
+        cpu->write_memory(read_pair(cpu, 2), value);
+    } else {
+        cpu->write_reg(reg, value);
+    }
+}
+
+// 16-bit operand following the opcode (low byte first)
+static uint16_t read_address(CPU8085Functions* cpu, uint16_t pc) {
+    uint8_t low = cpu->read_memory(pc + 1);
+    uint8_t high = cpu->read_memory(pc + 2);
+    return ((uint16_t)high << 8) | low;
+}
+
+static uint8_t add_with_flags(CPU8085Functions* cpu, uint8_t a, uint8_t b, uint8_t carry) {
+    uint16_t sum = (uint16_t)a + b + carry;
+    uint8_t result = sum & 0xFF;
+    uint8_t flags = szp_flags(result);
+    if (sum > 0xFF) flags |= FLAG_C;
+    if (((a & 0x0F) + (b & 0x0F) + carry) > 0x0F) flags |= FLAG_AC;
+    cpu->set_flags(flags);
+    return result;
+}
+
+// Subtraction is performed as a + ~b + !borrow; CY holds the borrow
+static uint8_t sub_with_flags(CPU8085Functions* cpu, uint8_t a, uint8_t b, uint8_t borrow) {
+    uint8_t result = a - b - borrow;
+    uint8_t flags = szp_flags(result);
+    if ((uint16_t)a < (uint16_t)b + borrow) flags |= FLAG_C;
+    if (((a & 0x0F) + (~b & 0x0F) + !borrow) > 0x0F) flags |= FLAG_AC;
     cpu->set_flags(flags);
+    return result;
+}
+
+static void push_word(CPU8085Functions* cpu, uint16_t value) {
+    uint16_t sp = cpu->get_sp();
+    cpu->write_memory(sp - 1, value >> 8);
+    cpu->write_memory(sp - 2, value & 0xFF);
+    cpu->set_sp(sp - 2);
 }
 
-__declspec(dllexport) int execute_instruction(CPU8085Functions* cpu) {
+static uint16_t pop_word(CPU8085Functions* cpu) {
+    uint16_t sp = cpu->get_sp();
+    uint8_t low = cpu->read_memory(sp);
+    uint8_t high = cpu->read_memory(sp + 1);
+    cpu->set_sp(sp + 2);
+    return ((uint16_t)high << 8) | low;
+}
+
+// Condition encoded in bits 5-3 of Jcc/Ccc/Rcc: NZ, Z, NC, C, PO, PE, P, M
+static bool condition_met(CPU8085Functions* cpu, uint8_t opcode) {
+    uint8_t flags = cpu->get_flags();
+    switch ((opcode >> 3) & 0x07) {
+        case 0: return !(flags & FLAG_Z);
+        case 1: return (flags & FLAG_Z) != 0;
+        case 2: return !(flags & FLAG_C);
+        case 3: return (flags & FLAG_C) != 0;
+        case 4: return !(flags & FLAG_P);
+        case 5: return (flags & FLAG_P) != 0;
+        case 6: return !(flags & FLAG_S);
+        default: return (flags & FLAG_S) != 0;
+    }
+}
+
+// AFL-style edge coverage: the counter of the edge between the previous and
+// the current branch target is incremented (saturating) count times.
+static void record_edge(CPU8085Functions* cpu, uint16_t target, uint32_t count) {
+    if (!cpu->coverage) return;
+    uint32_t mask = cpu->coverage_size - 1;
+    uint32_t location = ((target >> 4) ^ ((uint32_t)target << 8)) & mask;
+    uint8_t* counter = &cpu->coverage[location ^ cpu->coverage_prev];
+    *counter = *counter == 0xFF ? 0xFF : *counter + 1;
+    if (count > 1) {
+        // Further hits of a self loop come from the target itself
+        counter = &cpu->coverage[location ^ (location >> 1)];
+        *counter = (*counter + count - 1 > 0xFF) ? 0xFF : *counter + count - 1;
+    }
+    cpu->coverage_prev = location >> 1;
+}
+
+// Control transfer of JMP/Jcc/CALL/Ccc/RET/Rcc/RST/PCHL, taken or not
+static void branch_to(CPU8085Functions* cpu, uint16_t target) {
+    record_edge(cpu, target, 1);
+    cpu->set_pc(target);
+}
+
+static int jump_if(CPU8085Functions* cpu, uint16_t pc, bool condition) {
+    if (condition) {
+        cpu->cycles += JUMP_TAKEN_EXTRA;
+        branch_to(cpu, read_address(cpu, pc));
+    } else {
+        branch_to(cpu, pc + 3); // If condition not met
+    }
+    return 1;
+}
+
+static int call_if(CPU8085Functions* cpu, uint16_t pc, bool condition) {
+    if (condition) {
+        cpu->cycles += CALL_TAKEN_EXTRA;
+        uint16_t addr = read_address(cpu, pc);
+        push_word(cpu, pc + 3);
+        branch_to(cpu, addr);
+    } else {
+        branch_to(cpu, pc + 3);
+    }
+    return 1;
+}
+
+static int return_if(CPU8085Functions* cpu, uint16_t pc, bool condition) {
+    if (condition) {
+        cpu->cycles += RETURN_TAKEN_EXTRA;
+        branch_to(cpu, pop_word(cpu));
+    } else {
+        branch_to(cpu, pc + 1);
+    }
+    return 1;
+}
+
+// Completes a delay loop starting at pc in a single step. Two idioms are
+// recognised, both only touching their counter, A and the flags:
+//     DCR r / JNZ pc                     (r is not M)
+//     DCX rp / MOV A,x / ORA y / JNZ pc  (x and y are the two halves of rp)
+// Whole iterations are executed up to cpu->budget instructions, leaving the
+// exact state step-by-step execution would have reached.
+// Returns the number of instructions retired, 0 if no loop was fast-forwarded.
+static uint32_t fast_forward(CPU8085Functions* cpu, uint16_t pc, uint8_t opcode) {
+    if ((opcode & 0xC7) == 0x05 && opcode != 0x35) { // DCR r (00rrr101)
+        if (cpu->read_memory(pc + 1) != 0xC2 || read_address(cpu, pc + 1) != pc) return 0;
+        uint8_t reg = (opcode >> 3) & 0x07;
+        uint8_t value = cpu->read_reg(reg);
+        uint32_t iterations = value ? value : 256;
+        if (iterations > cpu->budget / 2) iterations = cpu->budget / 2;
+        if (iterations < 2) return 0;
+        uint8_t result = value - iterations;
+        uint8_t flags = szp_flags(result) | (cpu->get_flags() & FLAG_C);
+        if ((result + 1) & 0x0F) flags |= FLAG_AC;
+        cpu->write_reg(reg, result);
+        cpu->set_flags(flags);
+        uint32_t taken = result == 0 ? iterations - 1 : iterations;
+        record_edge(cpu, pc, taken);
+        if (result == 0) record_edge(cpu, pc + 4, 1);
+        cpu->set_pc(result == 0 ? pc + 4 : pc);
+        cpu->cycles += iterations * 14 - (result == 0 ? JUMP_TAKEN_EXTRA : 0);
+        return iterations * 2;
+    }
+    if ((opcode & 0xCF) == 0x0B && opcode != 0x3B) { // DCX B, D, H (00rp1011)
+        uint8_t rp = (opcode >> 4) & 0x03;
+        uint8_t mov = cpu->read_memory(pc + 1);
+        uint8_t ora = cpu->read_memory(pc + 2);
+        uint8_t high = rp * 2, low = rp * 2 + 1;
+        bool operands = ((mov & 0x07) == high && (ora & 0x07) == low)
+                     || ((mov & 0x07) == low && (ora & 0x07) == high);
+        if ((mov & 0xF8) != 0x78 || (ora & 0xF8) != 0xB0 || !operands) return 0;
+        if (cpu->read_memory(pc + 3) != 0xC2 || read_address(cpu, pc + 3) != pc) return 0;
+        uint16_t value = read_pair(cpu, rp);
+        uint32_t iterations = value ? value : 0x10000;
+        if (iterations > cpu->budget / 4) iterations = cpu->budget / 4;
+        if (iterations < 2) return 0;
+        uint16_t result = value - iterations;
+        uint8_t a = (result >> 8) | (result & 0xFF);
+        write_pair(cpu, rp, result);
+        cpu->write_reg(REG_A, a);
+        cpu->set_flags(szp_flags(a));
+        uint32_t taken = result == 0 ? iterations - 1 : iterations;
+        record_edge(cpu, pc, taken);
+        if (result == 0) record_edge(cpu, pc + 6, 1);
+        cpu->set_pc(result == 0 ? pc + 6 : pc);
+        cpu->cycles += (uint64_t)iterations * 24 - (result == 0 ? JUMP_TAKEN_EXTRA : 0);
+        return iterations * 4;
+    }
+    return 0;
+}
+
+EXPORT int execute_instruction(CPU8085Functions* cpu) {
     uint16_t pc = cpu->get_pc();
     uint8_t opcode = cpu->read_memory(pc);
-    printf("Executing opcode: %02X\n", opcode);
-    printf("PC: %8X\n", pc);
-    printf("A: %4X B: %4X C: %4X D: %4X E: %4X H: %4X L: %4X\n",
-           cpu->read_reg(REG_A), cpu->read_reg(REG_B), cpu->read_reg(REG_C),
-           cpu->read_reg(REG_D), cpu->read_reg(REG_E), cpu->read_reg(REG_H),
-           cpu->read_reg(REG_L));
-    printf("SP: %8X\n", cpu->get_sp());
-
-    printf("Carry= %d, Zero= %d, Sign= %d, Parity= %d, Aux Carry= %d\n",
-           (cpu->get_flags() & FLAG_C) ? 1 : 0,
-           (cpu->get_flags() & FLAG_Z) ? 1 : 0,
-           (cpu->get_flags() & FLAG_S) ? 1 : 0,
-           (cpu->get_flags() & FLAG_P) ? 1 : 0,
-           (cpu->get_flags() & FLAG_AC) ? 1 : 0);
-    printf("---------------------------------------\n");   
-    
+    bool trace = (cpu->options & OPT_TRACE) != 0;
+    if ((cpu->options & OPT_FAST_FORWARD) && cpu->budget > 1) {
+        uint32_t retired = fast_forward(cpu, pc, opcode);
+        if (retired) {
+            cpu->retired = retired;
+            return 1;
+        }
+    }
+    cpu->retired = 1;
+    cpu->cycles += CYCLES[opcode];
+    if (trace) {
+        printf("Executing opcode: %02X\n", opcode);
+        printf("PC: %8X\n", pc);
+        printf("A: %4X B: %4X C: %4X D: %4X E: %4X H: %4X L: %4X\n",
+               cpu->read_reg(REG_A), cpu->read_reg(REG_B), cpu->read_reg(REG_C),
+               cpu->read_reg(REG_D), cpu->read_reg(REG_E), cpu->read_reg(REG_H),
+               cpu->read_reg(REG_L));
+        printf("SP: %8X\n", cpu->get_sp());
+
+        printf("Carry= %d, Zero= %d, Sign= %d, Parity= %d, Aux Carry= %d\n",
+               (cpu->get_flags() & FLAG_C) ? 1 : 0,
+               (cpu->get_flags() & FLAG_Z) ? 1 : 0,
+               (cpu->get_flags() & FLAG_S) ? 1 : 0,
+               (cpu->get_flags() & FLAG_P) ? 1 : 0,
+               (cpu->get_flags() & FLAG_AC) ? 1 : 0);
+        printf("---------------------------------------\n");
+    }
+
     // --- MVI Instruction (format: 00ddd110) ---
     if ((opcode & 0xC7) == 0x06) {
         uint8_t dest = (opcode >> 3) & 0x07;
         uint8_t imm = cpu->read_memory(pc + 1);
-        if (dest == REG_M) {
-            // For MVI M, the effective address is in the register pair H and L.
-            uint16_t addr = ((uint16_t)cpu->read_reg(REG_H) << 8) | cpu->read_reg(REG_L);
-            cpu->write_memory(addr, imm);
-        } else {
-            cpu->write_reg(dest, imm);
-        }
+        // For MVI M, the effective address is in the register pair H and L.
+        write_operand(cpu, dest, imm);
         cpu->set_pc(pc + 2);
         return 1;
     }
@@ -110,79 +386,136 @@ __declspec(dllexport) int execute_instruction(CPU8085Functions* cpu) {
                 return 1;
             } else if ((opcode & 0x0F) == 0x1) { // LXI B, D, H, SP (00rp0001)
                 uint8_t rp = (opcode >> 4) & 0x03;
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // Register pair decode logic would go here
+                write_pair(cpu, rp, read_address(cpu, pc));
                 cpu->set_pc(pc + 3);
                 return 1;
             } else if (opcode == 0x02 || opcode == 0x12) { // STAX B/D
                 uint8_t rp = (opcode >> 4) & 0x01;
-                // STAX implementation would go here
+                cpu->write_memory(read_pair(cpu, rp), cpu->read_reg(REG_A));
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0x0A || opcode == 0x1A) { // LDAX B/D
                 uint8_t rp = (opcode >> 4) & 0x01;
-                // LDAX implementation would go here
+                cpu->write_reg(REG_A, cpu->read_memory(read_pair(cpu, rp)));
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0x0F) == 0x9) { // DAD B, D, H, SP (00rp1001)
                 uint8_t rp = (opcode >> 4) & 0x03;
-                // DAD implementation would go here
+                uint32_t sum = (uint32_t)read_pair(cpu, 2) + read_pair(cpu, rp);
+                write_pair(cpu, 2, sum & 0xFFFF);
+                uint8_t flags = cpu->get_flags() & ~FLAG_C;
+                if (sum > 0xFFFF) flags |= FLAG_C;
+                cpu->set_flags(flags);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0x0F) == 0x3) { // INX B, D, H, SP (00rp0011)
                 uint8_t rp = (opcode >> 4) & 0x03;
-                // INX implementation would go here
+                write_pair(cpu, rp, read_pair(cpu, rp) + 1);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0x0F) == 0xB) { // DCX B, D, H, SP (00rp1011)
                 uint8_t rp = (opcode >> 4) & 0x03;
-                // DCX implementation would go here
+                write_pair(cpu, rp, read_pair(cpu, rp) - 1);
                 cpu->set_pc(pc + 1);
-                return 1;  
+                return 1;
             } else if (opcode == 0x07) { // RLC
+                uint8_t a = cpu->read_reg(REG_A);
+                uint8_t carry = a >> 7;
+                cpu->write_reg(REG_A, (a << 1) | carry);
+                cpu->set_flags((cpu->get_flags() & ~FLAG_C) | carry);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0x0F) { // RRC
+                uint8_t a = cpu->read_reg(REG_A);
+                uint8_t carry = a & 0x01;
+                cpu->write_reg(REG_A, (a >> 1) | (carry << 7));
+                cpu->set_flags((cpu->get_flags() & ~FLAG_C) | carry);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0x17) { // RAL
+                uint8_t a = cpu->read_reg(REG_A);
+                uint8_t flags = cpu->get_flags();
+                cpu->write_reg(REG_A, (a << 1) | (flags & FLAG_C));
+                cpu->set_flags((flags & ~FLAG_C) | (a >> 7));
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0x1F) { // RAR
+                uint8_t a = cpu->read_reg(REG_A);
+                uint8_t flags = cpu->get_flags();
+                cpu->write_reg(REG_A, (a >> 1) | ((flags & FLAG_C) << 7));
+                cpu->set_flags((flags & ~FLAG_C) | (a & 0x01));
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0x22) { // SHLD addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // SHLD implementation would go here
+                uint16_t addr = read_address(cpu, pc);
+                cpu->write_memory(addr, cpu->read_reg(REG_L));
+                cpu->write_memory(addr + 1, cpu->read_reg(REG_H));
                 cpu->set_pc(pc + 3);
                 return 1;
             } else if (opcode == 0x2A) { // LHLD addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // LHLD implementation would go here
+                uint16_t addr = read_address(cpu, pc);
+                cpu->write_reg(REG_L, cpu->read_memory(addr));
+                cpu->write_reg(REG_H, cpu->read_memory(addr + 1));
                 cpu->set_pc(pc + 3);
                 return 1;
-            } else if (opcode == 0x20) { // RIM
-                // RIM implementation would go here
+            } else if (opcode == 0x32) { // STA addr
+                cpu->write_memory(read_address(cpu, pc), cpu->read_reg(REG_A));
+                cpu->set_pc(pc + 3);
+                return 1;
+            } else if (opcode == 0x3A) { // LDA addr
+                cpu->write_reg(REG_A, cpu->read_memory(read_address(cpu, pc)));
+                cpu->set_pc(pc + 3);
+                return 1;
+            } else if (opcode == 0x20 || opcode == 0x30) { // RIM / SIM
+                // No interrupt controller is emulated, so these behave as NOP
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0x27) { // DAA
-                // DAA implementation would go here
+                uint8_t a = cpu->read_reg(REG_A);
+                uint8_t flags = cpu->get_flags();
+                uint8_t correction = 0;
+                uint8_t carry = flags & FLAG_C;
+                if ((a & 0x0F) > 9 || (flags & FLAG_AC)) correction |= 0x06;
+                if (a > 0x99 || carry) {
+                    correction |= 0x60;
+                    carry = FLAG_C;
+                }
+                uint8_t result = a + correction;
+                flags = szp_flags(result) | carry;
+                if (((a & 0x0F) + (correction & 0x0F)) > 0x0F) flags |= FLAG_AC;
+                cpu->write_reg(REG_A, result);
+                cpu->set_flags(flags);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0x07) == 0x4) { // INR r (00rrr100)
                 uint8_t reg = (opcode >> 3) & 0x07;
-                // INR implementation would go here
+                uint8_t result = read_operand(cpu, reg) + 1;
+                uint8_t flags = szp_flags(result) | (cpu->get_flags() & FLAG_C);
+                if ((result & 0x0F) == 0) flags |= FLAG_AC;
+                write_operand(cpu, reg, result);
+                cpu->set_flags(flags);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0x07) == 0x5) { // DCR r (00rrr101)
                 uint8_t reg = (opcode >> 3) & 0x07;
-                // DCR implementation would go here
+                uint8_t value = read_operand(cpu, reg);
+                uint8_t result = value - 1;
+                uint8_t flags = szp_flags(result) | (cpu->get_flags() & FLAG_C);
+                if (value & 0x0F) flags |= FLAG_AC;
+                write_operand(cpu, reg, result);
+                cpu->set_flags(flags);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0x2F) { // CMA
+                cpu->write_reg(REG_A, ~cpu->read_reg(REG_A));
+                cpu->set_pc(pc + 1);
+                return 1;
+            } else if (opcode == 0x37) { // STC
+                cpu->set_flags(cpu->get_flags() | FLAG_C);
+                cpu->set_pc(pc + 1);
+                return 1;
+            } else if (opcode == 0x3F) { // CMC
+                cpu->set_flags(cpu->get_flags() ^ FLAG_C);
                 cpu->set_pc(pc + 1);
                 return 1;
             }
@@ -197,21 +530,8 @@ __declspec(dllexport) int execute_instruction(CPU8085Functions* cpu) {
             }
             uint8_t dest = (opcode >> 3) & 0x07;
             uint8_t src  = opcode & 0x07;
-            uint8_t value;
-            // If source is memory (M), read from address in H and L.
-            if (src == REG_M) {
-                uint16_t addr = ((uint16_t)cpu->read_reg(REG_H) << 8) | cpu->read_reg(REG_L);
-                value = cpu->read_memory(addr);
-            } else {
-                value = cpu->read_reg(src);
-            }
-            // If destination is memory (M), write the value to memory at address from (H,L).
-            if (dest == REG_M) {
-                uint16_t addr = ((uint16_t)cpu->read_reg(REG_H) << 8) | cpu->read_reg(REG_L);
-                cpu->write_memory(addr, value);
-            } else {
-                cpu->write_reg(dest, value);
-            }
+            // If source or destination is memory (M), the address is taken from H and L.
+            write_operand(cpu, dest, read_operand(cpu, src));
             cpu->set_pc(pc + 1);
             return 1;
 
@@ -219,46 +539,54 @@ __declspec(dllexport) int execute_instruction(CPU8085Functions* cpu) {
         case 0x2:
             if ((opcode & 0xF8) == 0x80) { // ADD r (10000rrr)
                 uint8_t src = opcode & 0x07;
-                uint8_t result = cpu->read_reg(REG_A) + cpu->read_reg(src);
-                update_flags(cpu, result);
+                uint8_t result = add_with_flags(cpu, cpu->read_reg(REG_A), read_operand(cpu, src), 0);
                 cpu->write_reg(REG_A, result);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0xF8) == 0x88) { // ADC r (10001rrr)
                 uint8_t src = opcode & 0x07;
-                // ADC implementation would go here
+                uint8_t carry = cpu->get_flags() & FLAG_C;
+                uint8_t result = add_with_flags(cpu, cpu->read_reg(REG_A), read_operand(cpu, src), carry);
+                cpu->write_reg(REG_A, result);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0xF8) == 0x90) { // SUB r (10010rrr)
                 uint8_t src = opcode & 0x07;
-                uint8_t result = cpu->read_reg(REG_A) - cpu->read_reg(src);
-                update_flags(cpu, result);
+                uint8_t result = sub_with_flags(cpu, cpu->read_reg(REG_A), read_operand(cpu, src), 0);
                 cpu->write_reg(REG_A, result);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0xF8) == 0x98) { // SBB r (10011rrr)
                 uint8_t src = opcode & 0x07;
-                // SBB implementation would go here
+                uint8_t borrow = cpu->get_flags() & FLAG_C;
+                uint8_t result = sub_with_flags(cpu, cpu->read_reg(REG_A), read_operand(cpu, src), borrow);
+                cpu->write_reg(REG_A, result);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0xF8) == 0xA0) { // ANA r (10100rrr)
                 uint8_t src = opcode & 0x07;
-                // ANA implementation would go here
+                uint8_t result = cpu->read_reg(REG_A) & read_operand(cpu, src);
+                cpu->write_reg(REG_A, result);
+                cpu->set_flags(szp_flags(result) | FLAG_AC);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0xF8) == 0xA8) { // XRA r (10101rrr)
                 uint8_t src = opcode & 0x07;
-                // XRA implementation would go here
+                uint8_t result = cpu->read_reg(REG_A) ^ read_operand(cpu, src);
+                cpu->write_reg(REG_A, result);
+                update_flags(cpu, result);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0xF8) == 0xB0) { // ORA r (10110rrr)
                 uint8_t src = opcode & 0x07;
-                // ORA implementation would go here
+                uint8_t result = cpu->read_reg(REG_A) | read_operand(cpu, src);
+                cpu->write_reg(REG_A, result);
+                update_flags(cpu, result);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if ((opcode & 0xF8) == 0xB8) { // CMP r (10111rrr)
                 uint8_t src = opcode & 0x07;
-                // CMP implementation would go here
+                sub_with_flags(cpu, cpu->read_reg(REG_A), read_operand(cpu, src), 0);
                 cpu->set_pc(pc + 1);
                 return 1;
             }
@@ -266,55 +594,36 @@ __declspec(dllexport) int execute_instruction(CPU8085Functions* cpu) {
 
         // 11: Branch, stack, and I/O operations
         case 0x3:
-            
+
             if (opcode == 0xC3) { // JMP addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                uint16_t addr = ((uint16_t)high << 8) | low;
-                cpu->set_pc(addr);
+                branch_to(cpu, read_address(cpu, pc));
                 return 1;
             } else if (opcode == 0xC2) { // JNZ addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                uint16_t addr = ((uint16_t)high << 8) | low;
-                if (!(cpu->get_flags() & FLAG_Z)) {
-                    cpu->set_pc(addr);
-                } else {
-                    cpu->set_pc(pc + 3); // If condition not met
-                }
-                return 1;
+                return jump_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xCA) { // JZ addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                uint16_t addr = ((uint16_t)high << 8) | low;
-                if (cpu->get_flags() & FLAG_Z) {
-                    cpu->set_pc(addr);
-                } else {
-                    cpu->set_pc(pc + 3);
-                }
-                return 1;
+                return jump_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xC6) { // ADI data
-                uint8_t result = cpu->read_reg(REG_A) + cpu->read_memory(pc + 1);
-                update_flags(cpu, result);
+                uint8_t result = add_with_flags(cpu, cpu->read_reg(REG_A), cpu->read_memory(pc + 1), 0);
                 cpu->write_reg(REG_A, result);
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xCD) { // CALL addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // CALL implementation would go here
-                cpu->set_pc(pc + 3);
+                uint16_t addr = read_address(cpu, pc);
+                push_word(cpu, pc + 3);
+                branch_to(cpu, addr);
                 return 1;
             } else if ((opcode & 0xCF) == 0xC1) { // POP rp (11rp0001)
                 uint8_t rp = (opcode >> 4) & 0x03;
                 uint16_t sp = cpu->get_sp();
                 uint8_t low = cpu->read_memory(sp);
                 uint8_t high = cpu->read_memory(sp + 1);
-                printf("POP\n");
-                printf("SP: %8X\n", sp);
-                printf("sp-1: %8X\n", sp - 1);
-                printf("sp-2: %8X\n", sp - 2);
-                printf("rp: %d\n", rp);
+                if (trace) {
+                    printf("POP\n");
+                    printf("SP: %8X\n", sp);
+                    printf("sp-1: %8X\n", sp - 1);
+                    printf("sp-2: %8X\n", sp - 2);
+                    printf("rp: %d\n", rp);
+                }
                 switch (rp) {
                     case 0: // BC
                         cpu->write_reg(REG_C, low);
@@ -340,11 +649,13 @@ __declspec(dllexport) int execute_instruction(CPU8085Functions* cpu) {
                 // Extract register pair bits (bits 5-4 of opcode)
                 uint8_t rp = (opcode & 0x30) >> 4; // More explicit extraction of bits 5-4
                 uint16_t sp = cpu->get_sp();
-                printf("Push\n");
-                printf("SP: %8X\n", sp);
-                printf("sp-1: %8X\n", sp - 1);
-                printf("sp-2: %8X\n", sp - 2);
-                printf("rp: %d (opcode: 0x%02X)\n", rp, opcode);
+                if (trace) {
+                    printf("Push\n");
+                    printf("SP: %8X\n", sp);
+                    printf("sp-1: %8X\n", sp - 1);
+                    printf("sp-2: %8X\n", sp - 2);
+                    printf("rp: %d (opcode: 0x%02X)\n", rp, opcode);
+                }
                 switch (rp) {
                     case 0: // BC
                         cpu->write_memory(sp - 1, cpu->read_reg(REG_B));
@@ -367,164 +678,233 @@ __declspec(dllexport) int execute_instruction(CPU8085Functions* cpu) {
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0xC9) { // RET
-                // RET implementation would go here
+                branch_to(cpu, pop_word(cpu));
                 return 1;
             } else if (opcode == 0xCE) { // ACI
+                uint8_t carry = cpu->get_flags() & FLAG_C;
+                uint8_t result = add_with_flags(cpu, cpu->read_reg(REG_A), cpu->read_memory(pc + 1), carry);
+                cpu->write_reg(REG_A, result);
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xCC) { // CZ
-                cpu->set_pc(pc + 3);
-                return 1;
+                return call_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xC4) { // CNZ
-                cpu->set_pc(pc + 3);
-                return 1;
+                return call_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xC8) { // RZ
-                cpu->set_pc(pc + 1);
-                return 1;
+                return return_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xC0) { // RNZ
-                cpu->set_pc(pc + 1);
-                return 1;
-            } else if (opcode == 0xC7) { // RST
-                cpu->set_pc(pc + 1);
+                return return_if(cpu, pc, condition_met(cpu, opcode));
+            } else if ((opcode & 0xC7) == 0xC7) { // RST n (11nnn111)
+                push_word(cpu, pc + 1);
+                branch_to(cpu, opcode & 0x38);
                 return 1;
             } else if (opcode == 0xD3) { // OUT port
                 uint8_t port = cpu->read_memory(pc + 1);
-                // OUT implementation would go here
+                if (cpu->write_port) cpu->write_port(port, cpu->read_reg(REG_A));
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xDB) { // IN port
                 uint8_t port = cpu->read_memory(pc + 1);
-                // IN implementation would go here
+                if (cpu->read_port) cpu->write_reg(REG_A, cpu->read_port(port));
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xD2) { // JNC addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // JNC implementation would go here
-                cpu->set_pc(pc + 3);
-                return 1;
+                return jump_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xDA) { // JC addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // JC implementation would go here
-                cpu->set_pc(pc + 3);
-                return 1;
+                return jump_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xD6) { // SUI data
                 uint8_t imm = cpu->read_memory(pc + 1);
-                // SUI implementation would go here
+                cpu->write_reg(REG_A, sub_with_flags(cpu, cpu->read_reg(REG_A), imm, 0));
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xDE) { // SBI
+                uint8_t imm = cpu->read_memory(pc + 1);
+                uint8_t borrow = cpu->get_flags() & FLAG_C;
+                cpu->write_reg(REG_A, sub_with_flags(cpu, cpu->read_reg(REG_A), imm, borrow));
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xDC) { // CC
-                cpu->set_pc(pc + 3);
-                return 1;
+                return call_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xD4) { // CNC
-                cpu->set_pc(pc + 3);
-                return 1;
+                return call_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xD8) { // RC
-                cpu->set_pc(pc + 1);
-                return 1;
+                return return_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xD0) { // RNC
-                cpu->set_pc(pc + 1);
-                return 1;
+                return return_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xEB) { // XCHG
-                // XCHG implementation would go here
+                uint16_t de = read_pair(cpu, 1);
+                write_pair(cpu, 1, read_pair(cpu, 2));
+                write_pair(cpu, 2, de);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0xE3) { // XTHL
-                // XTHL implementation would go here
+                uint16_t sp = cpu->get_sp();
+                uint8_t low = cpu->read_memory(sp);
+                uint8_t high = cpu->read_memory(sp + 1);
+                cpu->write_memory(sp, cpu->read_reg(REG_L));
+                cpu->write_memory(sp + 1, cpu->read_reg(REG_H));
+                cpu->write_reg(REG_L, low);
+                cpu->write_reg(REG_H, high);
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0xE6) { // ANI data
                 uint8_t imm = cpu->read_memory(pc + 1);
-                // ANI implementation would go here
+                uint8_t result = cpu->read_reg(REG_A) & imm;
+                cpu->write_reg(REG_A, result);
+                cpu->set_flags(szp_flags(result) | FLAG_AC);
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xE9) { // PCHL
-                // PCHL implementation would go here
+                branch_to(cpu, read_pair(cpu, 2));
                 return 1;
             } else if (opcode == 0xE2) { // JPO addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // JPO implementation would go here
-                cpu->set_pc(pc + 3);
-                return 1;
+                return jump_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xEA) { // JPE addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // JPE implementation would go here
-                cpu->set_pc(pc + 3);
-                return 1;
+                return jump_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xEE) { // XRI
+                uint8_t result = cpu->read_reg(REG_A) ^ cpu->read_memory(pc + 1);
+                cpu->write_reg(REG_A, result);
+                update_flags(cpu, result);
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xEC) { // CPE
-                cpu->set_pc(pc + 3);
-                return 1;
+                return call_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xE4) { // CPO
-                cpu->set_pc(pc + 3);
-                return 1;
+                return call_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xE8) { // RPE
-                cpu->set_pc(pc + 1);
-                return 1;
+                return return_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xE0) { // RPO
-                cpu->set_pc(pc + 1);
-                return 1;
+                return return_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xF6) { // ORI data
                 uint8_t imm = cpu->read_memory(pc + 1);
-                // ORI implementation would go here
+                uint8_t result = cpu->read_reg(REG_A) | imm;
+                cpu->write_reg(REG_A, result);
+                update_flags(cpu, result);
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xFE) { // CPI data
                 uint8_t imm = cpu->read_memory(pc + 1);
-                // CPI implementation would go here
+                sub_with_flags(cpu, cpu->read_reg(REG_A), imm, 0);
                 cpu->set_pc(pc + 2);
                 return 1;
             } else if (opcode == 0xF3) { // DI
-                // DI implementation would go here
+                // No interrupt controller is emulated, so DI behaves as NOP
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0xFB) { // EI
-                // EI implementation would go here
+                // No interrupt controller is emulated, so EI behaves as NOP
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0xF2) { // JP addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // JP implementation would go here
-                cpu->set_pc(pc + 3);
-                return 1;
+                return jump_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xFA) { // JM addr
-                uint8_t low = cpu->read_memory(pc + 1);
-                uint8_t high = cpu->read_memory(pc + 2);
-                // JM implementation would go here
-                cpu->set_pc(pc + 3);
-                return 1;
+                return jump_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xF9) { // SPHL
-                // SPHL implementation would go here
+                cpu->set_sp(read_pair(cpu, 2));
                 cpu->set_pc(pc + 1);
                 return 1;
             } else if (opcode == 0xF4) { // CP
-                cpu->set_pc(pc + 3);
-                return 1;
+                return call_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xFC) { // CM
-                cpu->set_pc(pc + 3);
-                return 1;
+                return call_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xF0) { // RP
-                cpu->set_pc(pc + 1);
-                return 1;
+                return return_if(cpu, pc, condition_met(cpu, opcode));
             } else if (opcode == 0xF8) { // RM
-                cpu->set_pc(pc + 1);
-                return 1;
+                return return_if(cpu, pc, condition_met(cpu, opcode));
             }
             break;
 
         default:
             break;
     }
-    
+
     // If we reach here, the opcode is unknown
     return -1;
-}
\ No newline at end of file
+}
+
+
+// --- Native execution ---
+// Accessors working directly on the Memory and Registers structures, so a
+// whole run stays inside the library without calling back into Python.
+static THREAD_LOCAL Memory* native_memory;
+static THREAD_LOCAL Registers* native_registers;
+
+// Registers stores A,B,C,D,E,H,L,M while the executor numbers B=0 ... A=7
+#define NATIVE_REG(reg) (((reg) + 1) & 0x07)
+
+static uint8_t native_read_memory(uint16_t address) {
+    return native_memory->data[address];
+}
+
+static void native_write_memory(uint16_t address, uint8_t value) {
+    memory_store(native_memory, address, value);
+}
+
+static uint8_t native_read_reg(uint8_t reg) {
+    return native_registers->regs[NATIVE_REG(reg)];
+}
+
+static void native_write_reg(uint8_t reg, uint8_t value) {
+    native_registers->regs[NATIVE_REG(reg)] = value;
+}
+
+static uint8_t native_get_flags(void) {
+    return native_registers->flags;
+}
+
+static void native_set_flags(uint8_t value) {
+    native_registers->flags = value;
+}
+
+static uint16_t native_get_pc(void) {
+    return native_registers->PC;
+}
+
+static void native_set_pc(uint16_t value) {
+    native_registers->PC = value;
+}
+
+static uint16_t native_get_sp(void) {
+    return native_registers->SP;
+}
+
+static void native_set_sp(uint16_t value) {
+    native_registers->SP = value;
+}
+
+// Executes up to max_instructions on the given memory and registers.
+// The memory and register function pointers in config are ignored, its
+// options, cycle counter, coverage map and port handlers are used; the
+// counter and the previous coverage location are updated on return.
+// Returns the last result code and stores the number of instructions that
+// completed with result 1 in executed.
+EXPORT int execute_native(Memory* mem, Registers* regs, CPU8085Functions* config,
+                          uint32_t max_instructions, uint32_t* executed) {
+    CPU8085Functions cpu = *config;
+    cpu.read_memory = native_read_memory;
+    cpu.write_memory = native_write_memory;
+    cpu.read_reg = native_read_reg;
+    cpu.write_reg = native_write_reg;
+    cpu.get_flags = native_get_flags;
+    cpu.set_flags = native_set_flags;
+    cpu.get_pc = native_get_pc;
+    cpu.set_pc = native_set_pc;
+    cpu.get_sp = native_get_sp;
+    cpu.set_sp = native_set_sp;
+
+    native_memory = mem;
+    native_registers = regs;
+
+    int result = 1;
+    uint32_t count = 0;
+    while (count < max_instructions) {
+        cpu.budget = max_instructions - count;
+        result = execute_instruction(&cpu);
+        if (result != 1) break;
+        count += cpu.retired;
+    }
+    config->cycles = cpu.cycles;
+    config->coverage_prev = cpu.coverage_prev;
+    *executed = count;
+    return result;
+}
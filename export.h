@@ -0,0 +1,11 @@
+#ifndef EXPORT_H
+#define EXPORT_H
+
+// Marks functions exported from the shared libraries on every platform
+#ifdef _WIN32
+#define EXPORT __declspec(dllexport)
+#else
+#define EXPORT __attribute__((visibility("default")))
+#endif
+
+#endif
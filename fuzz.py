@@ -0,0 +1,379 @@
+"""Coverage-guided fuzzing of 8085 routines.
+
+The executor records AFL-style edge coverage on every control transfer. Each
+execution writes a mutated input into the configured memory regions, restores
+the registers and only the memory pages the previous execution dirtied, then
+runs the routine. Inputs reaching new edges or new hit-count buckets join the
+corpus. Unknown opcodes, stack overflows and runs exceeding the instruction
+budget are reported as crashes. Routines that end in RET are given a return
+address holding a HLT, so returning from the routine ends the execution.
+
+Usage:
+    python fuzz.py program.asm --input 0x1000:16 [--entry ADDR] [--sp ADDR]
+                   [--return-address ADDR|none] [--iterations N]
+                   [--duration SECONDS] [--backend NAME]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import py8085 as py85
+import assembler
+import objformat
+
+# Stop reasons of a single execution
+STOP_HALT = 'halt'
+STOP_RETURN = 'return'
+STOP_UNKNOWN_OPCODE = 'unknown-opcode'
+STOP_STACK_OVERFLOW = 'stack-overflow'
+STOP_TIMEOUT = 'timeout'
+
+CRASH_KINDS = (STOP_UNKNOWN_OPCODE, STOP_STACK_OVERFLOW, STOP_TIMEOUT)
+
+# Byte values likely to hit boundary conditions in parsers and BCD code
+INTERESTING_VALUES = (0x00, 0x01, 0x09, 0x0A, 0x0D, 0x0F, 0x10, 0x20, 0x2F, 0x30,
+                      0x39, 0x3A, 0x40, 0x41, 0x7F, 0x80, 0x99, 0x9A, 0xFE, 0xFF)
+
+
+def _bucket_table():
+    """
+    Build the AFL hit count classification table.
+
+    Keyword arguments:
+    None --
+
+    Return: 256 bytes mapping a hit count to a one-bit bucket (bytes)
+    """
+    table = bytearray(256)
+    for count in range(1, 256):
+        if count <= 3:
+            table[count] = 1 << (count - 1)
+        elif count <= 7:
+            table[count] = 0x08
+        elif count <= 15:
+            table[count] = 0x10
+        elif count <= 31:
+            table[count] = 0x20
+        elif count <= 127:
+            table[count] = 0x40
+        else:
+            table[count] = 0x80
+    return bytes(table)
+
+
+BUCKETS = _bucket_table()
+
+
+class Crash:
+    """An input that made the routine misbehave."""
+
+    def __init__(self, kind, pc, data, executed):
+        """
+        Initialize a Crash object.
+
+        Keyword arguments:
+        kind -- one of CRASH_KINDS (str)
+        pc -- program counter when the execution stopped (int)
+        data -- input that triggered it (bytes)
+        executed -- instructions executed before it was detected (int)
+
+        Return: None
+        """
+        self.kind = kind
+        self.pc = pc
+        self.data = data
+        self.executed = executed
+
+    def __repr__(self):
+        return f"Crash({self.kind} at {self.pc:#06x} after {self.executed} instructions, input {self.data.hex()})"
+
+
+class Fuzzer:
+    """Mutates input regions of a CPU snapshot, keeping inputs that reach new coverage."""
+
+    def __init__(self, cpu, inputs, seeds=None, max_instructions=100000, stack_size=256,
+                 check_interval=256, coverage_size=py85.COVERAGE_SIZE, rng_seed=0, return_address=None):
+        """
+        Snapshot the CPU in its current state as the starting point of every execution.
+
+        Keyword arguments:
+        cpu -- CPU8085 object with the routine loaded and PC, SP and registers set (CPU8085)
+        inputs -- (address, length) memory regions filled from each input (list)
+        seeds -- initial inputs, each as long as all regions together, None for all zeros (default None)
+        max_instructions -- budget after which an execution counts as an infinite loop (default 100000)
+        stack_size -- bytes the stack may grow below its initial SP before it overflows (default 256)
+        check_interval -- instructions run between stack checks (default 256)
+        coverage_size -- number of edge counters, a power of two (default py85.COVERAGE_SIZE)
+        rng_seed -- seed of the mutation random generator (default 0)
+        return_address -- address pushed onto the stack as the routine's return address, a HLT is
+                          written there and reaching it ends the execution, None to push nothing (default None)
+
+        Return: None
+        """
+        self.cpu = cpu
+        self.inputs = list(inputs)
+        self.input_size = sum(length for _, length in self.inputs)
+        if self.input_size == 0:
+            raise ValueError("At least one non-empty input region is needed")
+        self.max_instructions = max_instructions
+        self.stack_size = stack_size
+        self.check_interval = check_interval
+        self.rng = random.Random(rng_seed)
+        self.return_address = return_address
+        if return_address is not None:
+            # The routine's final RET pops the sentinel and halts there
+            sp = (self.cpu.get_SP() - 2) & 0xFFFF
+            self.cpu.write_memory(return_address, 0x76)
+            self.cpu.write_memory(sp, return_address & 0xFF)
+            self.cpu.write_memory((sp + 1) & 0xFFFF, return_address >> 8)
+            self.cpu.set_SP(sp)
+
+        self.cpu.executor.set_trace(False)
+        self.cpu.executor.enable_coverage(coverage_size)
+        self.registers = self.cpu.get_register_state()
+        self.snapshot = self.cpu.memory.read_block(0, py85.MEMORY_SIZE)
+        self.cpu.memory.take_dirty_pages()
+        # A set bit means that edge/hit-count bucket has not been seen yet
+        self.virgin = (1 << (8 * coverage_size)) - 1
+
+        self.corpus = []
+        self.crashes = {}
+        self.executions = 0
+        self.elapsed = 0.0
+        for seed in seeds or [bytes(self.input_size)]:
+            if len(seed) != self.input_size:
+                raise ValueError(f"Seed of {len(seed)} bytes, the input regions hold {self.input_size}")
+            self._try(bytes(seed))
+            self.corpus.append(bytes(seed))
+
+    def execute(self, data):
+        """
+        Run the routine once on an input, starting from the snapshot.
+
+        Keyword arguments:
+        data -- input spread over the input regions in order (bytes)
+
+        Return: tuple of (stop reason, instructions executed) (tuple)
+        """
+        cpu = self.cpu
+        memory = cpu.memory
+        # Undo the previous execution: only the pages it wrote differ from the snapshot
+        for page in memory.take_dirty_pages():
+            start = page * py85.PAGE_SIZE
+            memory.write_block(start, self.snapshot[start:start + py85.PAGE_SIZE])
+        offset = 0
+        for address, length in self.inputs:
+            memory.write_block(address, data[offset:offset + length])
+            offset += length
+        # Input regions are rewritten every time, only the run's own writes need undoing
+        memory.take_dirty_pages()
+        cpu.set_register_state(self.registers)
+        cpu.executor.reset_coverage()
+
+        initial_sp = self.registers['SP']
+        executed = 0
+        while True:
+            result, count = cpu.run(min(self.check_interval, self.max_instructions - executed))
+            executed += count
+            if result == py85.RESULT_HALT:
+                if cpu.get_PC() == self.return_address:
+                    return STOP_RETURN, executed
+                return STOP_HALT, executed
+            if result == py85.RESULT_UNKNOWN_OPCODE:
+                return STOP_UNKNOWN_OPCODE, executed
+            depth = (initial_sp - cpu.get_SP()) & 0xFFFF
+            if self.stack_size < depth <= 0x8000:
+                return STOP_STACK_OVERFLOW, executed
+            if executed >= self.max_instructions:
+                return STOP_TIMEOUT, executed
+
+    def mutate(self, data):
+        """
+        Apply a stack of random byte-level mutations to an input.
+
+        Keyword arguments:
+        data -- input to mutate (bytes)
+
+        Return: the mutated input (bytes)
+        """
+        rng = self.rng
+        data = bytearray(data)
+        for _ in range(1 << rng.randrange(4)):
+            position = rng.randrange(len(data))
+            operation = rng.randrange(7)
+            if operation == 0:
+                data[position] ^= 1 << rng.randrange(8)
+            elif operation == 1:
+                data[position] = rng.choice(INTERESTING_VALUES)
+            elif operation == 2:
+                data[position] = (data[position] + rng.randrange(1, 36)) & 0xFF
+            elif operation == 3:
+                data[position] = (data[position] - rng.randrange(1, 36)) & 0xFF
+            elif operation == 4:
+                data[position] = rng.getrandbits(8)
+            elif operation == 5:
+                # Copy a run of bytes within the input
+                length = rng.randrange(1, len(data) - position + 1)
+                source = rng.randrange(len(data) - length + 1)
+                data[position:position + length] = data[source:source + length]
+            else:
+                # Splice in the same range of another corpus entry
+                other = rng.choice(self.corpus)
+                length = rng.randrange(1, len(data) - position + 1)
+                data[position:position + length] = other[position:position + length]
+        return bytes(data)
+
+    def fuzz(self, iterations=None, duration=None):
+        """
+        Mutate corpus entries and execute them until a limit is reached.
+
+        Keyword arguments:
+        iterations -- number of executions, None for no limit (default None)
+        duration -- seconds to fuzz for, None for no limit (default None)
+
+        Return: statistics as returned by stats (dict)
+        """
+        if iterations is None and duration is None:
+            raise ValueError("Give an iteration count, a duration or both")
+        start = time.perf_counter()
+        deadline = None if duration is None else start + duration
+        done = 0
+        while iterations is None or done < iterations:
+            if deadline is not None and done % 64 == 0 and time.perf_counter() >= deadline:
+                break
+            data = self.mutate(self.rng.choice(self.corpus))
+            if self._try(data):
+                self.corpus.append(data)
+            done += 1
+        self.elapsed += time.perf_counter() - start
+        return self.stats()
+
+    def edges(self):
+        """
+        Count the coverage map entries hit so far.
+
+        Keyword arguments:
+        None --
+
+        Return: number of distinct edges seen (int)
+        """
+        size = len(self.cpu.executor.read_coverage())
+        seen = ((1 << (8 * size)) - 1) ^ self.virgin
+        return sum(1 for counter in seen.to_bytes(size, 'little') if counter)
+
+    def stats(self):
+        """
+        Summarize the fuzzing session.
+
+        Keyword arguments:
+        None --
+
+        Return: executions, executions/sec, corpus size, edges and crash counts by kind (dict)
+        """
+        crashes = {kind: 0 for kind in CRASH_KINDS}
+        for crash in self.crashes.values():
+            crashes[crash.kind] += 1
+        return {
+            'executions': self.executions,
+            'seconds': self.elapsed,
+            'executions_per_sec': self.executions / self.elapsed if self.elapsed else 0.0,
+            'corpus': len(self.corpus),
+            'edges': self.edges(),
+            'crashes': crashes,
+        }
+
+    def _try(self, data):
+        reason, executed = self.execute(data)
+        self.executions += 1
+        if reason in CRASH_KINDS:
+            key = (reason, self.cpu.get_PC())
+            if key not in self.crashes:
+                self.crashes[key] = Crash(reason, key[1], data, executed)
+        trace = int.from_bytes(self.cpu.executor.read_coverage().translate(BUCKETS), 'little')
+        if trace & self.virgin:
+            self.virgin &= ~trace
+            return True
+        return False
+
+
+def parse_region(text):
+    """
+    Parse an input region given as ADDRESS:LENGTH, e.g. 0x1000:16.
+
+    Keyword arguments:
+    text -- region description (str)
+
+    Return: tuple of (address, length) (tuple)
+    """
+    address, _, length = text.partition(':')
+    try:
+        return int(address, 0), int(length, 0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid input region '{text}', expected ADDRESS:LENGTH") from None
+
+
+def load_program(cpu, filename, origin):
+    """
+    Load an assembly source, Intel HEX or raw binary program into a CPU.
+
+    Keyword arguments:
+    cpu -- CPU8085 object to load (CPU8085)
+    filename -- .asm source, .hex/.ihx Intel HEX or raw binary image (str)
+    origin -- load address of assembly and binary programs (int)
+
+    Return: number of bytes loaded (int)
+    """
+    if os.path.splitext(filename)[1].lower() == '.asm':
+        code = assembler.assembler().assemble_bytes(filename)
+        cpu.write_block(origin, code)
+        return len(code)
+    return objformat.load_blocks(cpu, objformat.read_image(filename, origin))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('program', help='.asm source, .hex/.ihx Intel HEX or raw binary image')
+    parser.add_argument('--input', type=parse_region, action='append', required=True,
+                        help='memory region filled from each input as ADDRESS:LENGTH, may be repeated')
+    parser.add_argument('--origin', type=lambda value: int(value, 0), default=0,
+                        help='load address of .asm and binary programs (default 0)')
+    parser.add_argument('--entry', type=lambda value: int(value, 0), default=None,
+                        help='address execution starts at (default: the origin)')
+    parser.add_argument('--sp', type=lambda value: int(value, 0), default=0xF000,
+                        help='initial stack pointer (default 0xF000)')
+    parser.add_argument('--return-address', type=lambda value: None if value.lower() == 'none' else int(value, 0),
+                        default=0xFFFF,
+                        help='return address pushed for routines ending in RET, a HLT is written there, '
+                             '"none" to push nothing (default 0xFFFF)')
+    parser.add_argument('--iterations', type=int, default=None, help='number of executions')
+    parser.add_argument('--duration', type=float, default=None, help='seconds to fuzz for (default 10)')
+    parser.add_argument('--max-instructions', type=int, default=100000,
+                        help='instructions after which an execution counts as an infinite loop')
+    parser.add_argument('--stack-size', type=int, default=256,
+                        help='bytes the stack may grow before it counts as overflowing')
+    parser.add_argument('--backend', choices=py85.BACKEND_ORDER, default=None,
+                        help='execution backend (default: fastest available)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the mutation random generator')
+    args = parser.parse_args(argv)
+    if args.iterations is None and args.duration is None:
+        args.duration = 10.0
+
+    cpu = py85.get_backend(args.backend).create_cpu()
+    load_program(cpu, args.program, args.origin)
+    cpu.set_PC(args.origin if args.entry is None else args.entry)
+    cpu.set_SP(args.sp)
+
+    fuzzer = Fuzzer(cpu, args.input, max_instructions=args.max_instructions,
+                    stack_size=args.stack_size, rng_seed=args.seed, return_address=args.return_address)
+    stats = fuzzer.fuzz(args.iterations, args.duration)
+    print(f"{stats['executions']} executions in {stats['seconds']:.1f}s "
+          f"({stats['executions_per_sec']:.0f} execs/sec), corpus {stats['corpus']}, edges {stats['edges']}")
+    for crash in fuzzer.crashes.values():
+        print(crash)
+    return 1 if fuzzer.crashes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
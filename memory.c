@@ -1,27 +1,61 @@
 #include <stdint.h>
 #include <stdlib.h>
 #include <string.h>
+#include "export.h"
+#include "memory.h"
 
-#define MEMORY_SIZE 65536
-
-typedef struct {
-    uint8_t data[MEMORY_SIZE];
-} Memory;
-
-__declspec(dllexport) Memory* create_memory() {
+EXPORT Memory* create_memory() {
     Memory* mem = (Memory*)malloc(sizeof(Memory));
-    memset(mem->data, 0, MEMORY_SIZE);
+    memset(mem, 0, sizeof(Memory));
     return mem;
 }
 
-__declspec(dllexport) void destroy_memory(Memory* mem) {
+EXPORT void destroy_memory(Memory* mem) {
     free(mem);
 }
 
-__declspec(dllexport) uint8_t read_memory(Memory* mem, uint16_t address) {
+EXPORT uint8_t read_memory(Memory* mem, uint16_t address) {
     return mem->data[address];
 }
 
-__declspec(dllexport) void write_memory(Memory* mem, uint16_t address, uint8_t value) {
-    mem->data[address] = value;
-}
\ No newline at end of file
+EXPORT void write_memory(Memory* mem, uint16_t address, uint8_t value) {
+    memory_store(mem, address, value);
+}
+
+EXPORT void read_block(Memory* mem, uint16_t address, uint8_t* buffer, uint32_t length) {
+    if (length > (uint32_t)(MEMORY_SIZE - address)) length = MEMORY_SIZE - address;
+    memcpy(buffer, mem->data + address, length);
+}
+
+// Bulk write used by loaders and snapshot restores; marks pages dirty but is not journaled
+EXPORT void write_block(Memory* mem, uint16_t address, const uint8_t* buffer, uint32_t length) {
+    if (length > (uint32_t)(MEMORY_SIZE - address)) length = MEMORY_SIZE - address;
+    if (length == 0) return;
+    memcpy(mem->data + address, buffer, length);
+    memset(mem->dirty + address / PAGE_SIZE, 1, (address + length - 1) / PAGE_SIZE - address / PAGE_SIZE + 1);
+}
+
+// Copies the dirty page bitmap into pages (PAGE_COUNT bytes), clears it and returns the dirty page count
+EXPORT uint32_t take_dirty_pages(Memory* mem, uint8_t* pages) {
+    uint32_t count = 0;
+    for (uint32_t page = 0; page < PAGE_COUNT; page++) {
+        count += mem->dirty[page];
+    }
+    memcpy(pages, mem->dirty, PAGE_COUNT);
+    memset(mem->dirty, 0, PAGE_COUNT);
+    return count;
+}
+
+EXPORT void set_journal(Memory* mem, uint8_t enabled) {
+    mem->journal_enabled = enabled;
+    mem->journal_length = 0;
+}
+
+// Copies the journaled writes (oldest first) into entries and empties the journal.
+// Returns the number of writes since the last drain, which exceeds JOURNAL_SIZE on overflow.
+EXPORT uint32_t drain_journal(Memory* mem, JournalEntry* entries) {
+    uint32_t length = mem->journal_length;
+    memcpy(entries, mem->journal, (length < JOURNAL_SIZE ? length : JOURNAL_SIZE) * sizeof(JournalEntry));
+    mem->journal_length = 0;
+    return length;
+}
@@ -0,0 +1,41 @@
+#ifndef MEMORY_H
+#define MEMORY_H
+
+#include <stdint.h>
+
+#define MEMORY_SIZE 65536
+
+// Dirty tracking granularity
+#define PAGE_SIZE 256
+#define PAGE_COUNT (MEMORY_SIZE / PAGE_SIZE)
+
+// Write journal capacity, the journal is meant to be drained after every instruction
+#define JOURNAL_SIZE 64
+
+typedef struct {
+    uint16_t address;
+    uint8_t old_value;
+} JournalEntry;
+
+typedef struct {
+    uint8_t data[MEMORY_SIZE];
+    uint8_t dirty[PAGE_COUNT];
+    uint8_t journal_enabled;
+    uint32_t journal_length; // keeps counting past JOURNAL_SIZE so overflows can be detected
+    JournalEntry journal[JOURNAL_SIZE];
+} Memory;
+
+// Every write goes through here so dirty pages and the journal stay accurate
+static inline void memory_store(Memory* mem, uint16_t address, uint8_t value) {
+    if (mem->journal_enabled) {
+        if (mem->journal_length < JOURNAL_SIZE) {
+            mem->journal[mem->journal_length].address = address;
+            mem->journal[mem->journal_length].old_value = mem->data[address];
+        }
+        mem->journal_length++;
+    }
+    mem->dirty[address / PAGE_SIZE] = 1;
+    mem->data[address] = value;
+}
+
+#endif
@@ -0,0 +1,214 @@
+"""Object image formats: Intel HEX and raw binary encoding, parsing and loading.
+
+Images are handled as lists of (address, bytes) blocks. Parsing coalesces
+adjacent HEX data records into contiguous runs so that loading costs a single
+write_block call per run rather than one call per byte.
+"""
+import os
+
+# File extensions recognised as Intel HEX, anything else is loaded as raw binary
+HEX_EXTENSIONS = ('.hex', '.ihx')
+
+# Intel HEX record types
+RECORD_DATA = 0x00
+RECORD_EOF = 0x01
+RECORD_EXTENDED_SEGMENT = 0x02
+RECORD_START_SEGMENT = 0x03
+RECORD_EXTENDED_LINEAR = 0x04
+RECORD_START_LINEAR = 0x05
+
+# Data length required by the address and start address record types
+RECORD_LENGTHS = {
+    RECORD_EXTENDED_SEGMENT: 2,
+    RECORD_START_SEGMENT: 4,
+    RECORD_EXTENDED_LINEAR: 2,
+    RECORD_START_LINEAR: 4,
+}
+
+MEMORY_SIZE = 0x10000
+
+
+def _record(record_type, address, data=b''):
+    """
+    Format a single Intel HEX record.
+
+    Keyword arguments:
+    record_type -- record type byte (int)
+    address -- 16-bit record address (int)
+    data -- record payload (default b'')
+
+    Return: the record line without line terminator (str)
+    """
+    body = bytes([len(data), (address >> 8) & 0xFF, address & 0xFF, record_type]) + bytes(data)
+    checksum = -sum(body) & 0xFF
+    return ':' + (body + bytes([checksum])).hex().upper()
+
+
+def encode_intel_hex(data, origin=0, record_size=16):
+    """
+    Encode machine code as Intel HEX.
+
+    Keyword arguments:
+    data -- machine code to encode (bytes)
+    origin -- load address of the first byte (default 0)
+    record_size -- maximum data bytes per record (default 16)
+
+    Return: Intel HEX text terminated by an EOF record (str)
+    """
+    if origin + len(data) > MEMORY_SIZE:
+        raise ValueError(f"{len(data)} bytes at {origin:#06x} do not fit in 64 KB")
+    lines = [_record(RECORD_DATA, origin + offset, data[offset:offset + record_size])
+             for offset in range(0, len(data), record_size)]
+    lines.append(_record(RECORD_EOF, 0))
+    return '\n'.join(lines) + '\n'
+
+
+def parse_intel_hex(text):
+    """
+    Parse Intel HEX text, validating every record checksum.
+
+    Keyword arguments:
+    text -- contents of an Intel HEX file (str)
+
+    Return: tuple of (list of (address, bytes) contiguous blocks, start address or None) (tuple)
+    """
+    blocks = []
+    run_address = None
+    run = bytearray()
+    base = 0
+    start_address = None
+    for line_num, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] != ':':
+            raise ValueError(f"Missing ':' at the start of line {line_num}")
+        try:
+            record = bytes.fromhex(line[1:])
+        except ValueError:
+            raise ValueError(f"Invalid hex digits at line {line_num}") from None
+        if len(record) < 5 or len(record) != record[0] + 5:
+            raise ValueError(f"Record length mismatch at line {line_num}")
+        if sum(record) & 0xFF:
+            raise ValueError(f"Checksum mismatch at line {line_num}")
+        length, record_type = record[0], record[3]
+        address = base + ((record[1] << 8) | record[2])
+        data = record[4:4 + length]
+
+        if record_type == RECORD_DATA:
+            if address + length > MEMORY_SIZE:
+                raise ValueError(f"Data at line {line_num} extends past the 64 KB address space")
+            if run_address is not None and address == run_address + len(run):
+                run += data
+            else:
+                if run:
+                    blocks.append((run_address, bytes(run)))
+                run_address, run = address, bytearray(data)
+        elif record_type == RECORD_EOF:
+            break
+        elif record_type in RECORD_LENGTHS and length != RECORD_LENGTHS[record_type]:
+            raise ValueError(f"Record type {record_type:#04x} needs {RECORD_LENGTHS[record_type]} "
+                             f"data bytes, got {length} at line {line_num}")
+        elif record_type == RECORD_EXTENDED_SEGMENT:
+            base = ((data[0] << 8) | data[1]) << 4
+        elif record_type == RECORD_EXTENDED_LINEAR:
+            base = ((data[0] << 8) | data[1]) << 16
+        elif record_type in (RECORD_START_SEGMENT, RECORD_START_LINEAR):
+            start_address = int.from_bytes(data, 'big') & 0xFFFF
+        else:
+            raise ValueError(f"Unknown record type {record_type:#04x} at line {line_num}")
+    else:
+        raise ValueError("Missing end of file record")
+    if run:
+        blocks.append((run_address, bytes(run)))
+    return blocks, start_address
+
+
+def load_blocks(memory, blocks, offset=0):
+    """
+    Write image blocks into memory with one write_block call per block.
+
+    Keyword arguments:
+    memory -- Memory, PyMemory or CPU8085 object to load (object)
+    blocks -- list of (address, bytes) blocks (list)
+    offset -- added to every block address (default 0)
+
+    Return: number of bytes loaded (int)
+    """
+    loaded = 0
+    for address, data in blocks:
+        address += offset
+        if address < 0 or address + len(data) > MEMORY_SIZE:
+            raise ValueError(f"Block of {len(data)} bytes at {address:#06x} does not fit in 64 KB")
+        memory.write_block(address, data)
+        loaded += len(data)
+    return loaded
+
+
+def read_image(filename, origin=0):
+    """
+    Read an Intel HEX or raw binary image file into blocks.
+
+    Keyword arguments:
+    filename -- image file, Intel HEX if its extension is in HEX_EXTENSIONS (str)
+    origin -- load address of a binary image, or offset added to HEX addresses (default 0)
+
+    Return: list of (address, bytes) blocks (list)
+    """
+    if os.path.splitext(filename)[1].lower() in HEX_EXTENSIONS:
+        with open(filename, 'r') as f:
+            blocks, _ = parse_intel_hex(f.read())
+        return [(address + origin, data) for address, data in blocks]
+    with open(filename, 'rb') as f:
+        return [(origin, f.read())]
+
+
+def load_hex(memory, filename, offset=0):
+    """
+    Load an Intel HEX file into memory.
+
+    Keyword arguments:
+    memory -- Memory, PyMemory or CPU8085 object to load (object)
+    filename -- Intel HEX file (str)
+    offset -- added to every record address (default 0)
+
+    Return: number of bytes loaded (int)
+    """
+    with open(filename, 'r') as f:
+        blocks, _ = parse_intel_hex(f.read())
+    return load_blocks(memory, blocks, offset)
+
+
+def load_binary(memory, filename, origin=0):
+    """
+    Load a raw binary image into memory.
+
+    Keyword arguments:
+    memory -- Memory, PyMemory or CPU8085 object to load (object)
+    filename -- binary file (str)
+    origin -- load address of the first byte (default 0)
+
+    Return: number of bytes loaded (int)
+    """
+    with open(filename, 'rb') as f:
+        return load_blocks(memory, [(origin, f.read())])
+
+
+def load_images(memory, images):
+    """
+    Load several images at their own origins, refusing overlapping images.
+
+    Keyword arguments:
+    memory -- Memory, PyMemory or CPU8085 object to load (object)
+    images -- list of (filename, origin) pairs, see read_image (list)
+
+    Return: number of bytes loaded (int)
+    """
+    blocks = []
+    for filename, origin in images:
+        blocks += [(address, data, filename) for address, data in read_image(filename, origin)]
+    blocks.sort(key=lambda block: block[0])
+    for (address, data, filename), (next_address, _, next_filename) in zip(blocks, blocks[1:]):
+        if address + len(data) > next_address:
+            raise ValueError(f"{filename} overlaps {next_filename} at {next_address:#06x}")
+    return load_blocks(memory, [(address, data) for address, data, _ in blocks])
@@ -1,15 +1,17 @@
 from ctypes import *
 import os
-# Load the DLLs 
-try:
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    memory_dll = CDLL(os.path.join(current_dir, 'memory.dll'))
-    registers_dll = CDLL(os.path.join(current_dir, 'registers.dll'))
-    executor_dll = CDLL(os.path.join(current_dir, 'executor.dll'))
-except Exception as e:
-    print(f"Error loading DLLs: {e}")
-    exit(1)
-             
+import sys
+import warnings
+
+from pyexecutor import PyExecutor, COVERAGE_SIZE
+
+# Shared libraries are looked up here, PY8085_LIB_DIR overrides the package directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+LIBRARY_DIR = os.environ.get('PY8085_LIB_DIR', current_dir)
+
+class BackendError(Exception):
+    """Raised when a backend or one of its shared libraries cannot be used."""
+
 class CPU8085Functions(Structure):
     """Structure holding function pointers for the CPU executor."""
     _fields_ = [
@@ -22,36 +24,141 @@ class CPU8085Functions(Structure):
         ("get_pc", CFUNCTYPE(c_uint16)),
         ("set_pc", CFUNCTYPE(None, c_uint16)),
         ("get_sp", CFUNCTYPE(c_uint16)),
-        ("set_sp", CFUNCTYPE(None, c_uint16))
+        ("set_sp", CFUNCTYPE(None, c_uint16)),
+        ("options", c_uint32),
+        ("budget", c_uint32),
+        ("retired", c_uint32),
+        ("cycles", c_uint64),
+        ("coverage", POINTER(c_uint8)),
+        ("coverage_size", c_uint32),
+        ("coverage_prev", c_uint32),
+        ("read_port", CFUNCTYPE(c_uint8, c_uint8)),
+        ("write_port", CFUNCTYPE(None, c_uint8, c_uint8))
     ]
 
-# Configure DLL  for memory
-memory_dll.create_memory.restype = c_void_p
-memory_dll.destroy_memory.argtypes = [c_void_p]
-memory_dll.read_memory.argtypes = [c_void_p, c_uint16]
-memory_dll.read_memory.restype = c_uint8
-memory_dll.write_memory.argtypes = [c_void_p, c_uint16, c_uint8]
-
-# Configure DLL  for registers
-# It is possible now to create other memory definitions in c as long as they meet the specifications
-registers_dll.create_registers.restype = c_void_p
-registers_dll.destroy_registers.argtypes = [c_void_p]
-registers_dll.read_reg.argtypes = [c_void_p, c_uint8]
-registers_dll.read_reg.restype = c_uint8
-registers_dll.write_reg.argtypes = [c_void_p, c_uint8, c_uint8]
-registers_dll.get_flags.argtypes = [c_void_p]
-registers_dll.get_flags.restype = c_uint8
-registers_dll.set_flags.argtypes = [c_void_p, c_uint8]
-registers_dll.get_PC.argtypes = [c_void_p]
-registers_dll.get_PC.restype = c_uint16
-registers_dll.set_PC.argtypes = [c_void_p, c_uint16]
-registers_dll.get_SP.argtypes = [c_void_p]
-registers_dll.get_SP.restype = c_uint16
-registers_dll.set_SP.argtypes = [c_void_p, c_uint16]
-
-# Configure DLL  for executor
-executor_dll.execute_instruction.argtypes = [POINTER(CPU8085Functions)]
-executor_dll.execute_instruction.restype = c_int
+# Executor option bits (see executor.c)
+OPTION_TRACE = 0x01
+OPTION_FAST_FORWARD = 0x02
+
+# Memory layout constants (see memory.h)
+MEMORY_SIZE = 0x10000
+PAGE_SIZE = 256
+PAGE_COUNT = MEMORY_SIZE // PAGE_SIZE
+JOURNAL_SIZE = 64
+
+class JournalEntry(Structure):
+    """A journaled memory write: the address and the value it overwrote."""
+    _fields_ = [
+        ("address", c_uint16),
+        ("old_value", c_uint8)
+    ]
+
+# General purpose registers, in the order state snapshots list them
+REGISTER_NAMES = ['A', 'B', 'C', 'D', 'E', 'H', 'L']
+
+# Result codes returned by execute_instruction
+RESULT_UNKNOWN_OPCODE = -1
+RESULT_HALT = 0
+RESULT_CONTINUE = 1
+
+def _configure_memory(lib):
+    """Declare the signatures exported by the memory library."""
+    lib.create_memory.restype = c_void_p
+    lib.destroy_memory.argtypes = [c_void_p]
+    lib.read_memory.argtypes = [c_void_p, c_uint16]
+    lib.read_memory.restype = c_uint8
+    lib.write_memory.argtypes = [c_void_p, c_uint16, c_uint8]
+    lib.read_block.argtypes = [c_void_p, c_uint16, c_void_p, c_uint32]
+    lib.write_block.argtypes = [c_void_p, c_uint16, c_char_p, c_uint32]
+    lib.take_dirty_pages.argtypes = [c_void_p, c_void_p]
+    lib.take_dirty_pages.restype = c_uint32
+    lib.set_journal.argtypes = [c_void_p, c_uint8]
+    lib.drain_journal.argtypes = [c_void_p, POINTER(JournalEntry)]
+    lib.drain_journal.restype = c_uint32
+
+def _configure_registers(lib):
+    """Declare the signatures exported by the registers library."""
+    # It is possible now to create other memory definitions in c as long as they meet the specifications
+    lib.create_registers.restype = c_void_p
+    lib.destroy_registers.argtypes = [c_void_p]
+    lib.read_reg.argtypes = [c_void_p, c_uint8]
+    lib.read_reg.restype = c_uint8
+    lib.write_reg.argtypes = [c_void_p, c_uint8, c_uint8]
+    lib.get_flags.argtypes = [c_void_p]
+    lib.get_flags.restype = c_uint8
+    lib.set_flags.argtypes = [c_void_p, c_uint8]
+    lib.get_PC.argtypes = [c_void_p]
+    lib.get_PC.restype = c_uint16
+    lib.set_PC.argtypes = [c_void_p, c_uint16]
+    lib.get_SP.argtypes = [c_void_p]
+    lib.get_SP.restype = c_uint16
+    lib.set_SP.argtypes = [c_void_p, c_uint16]
+
+def _configure_executor(lib):
+    """Declare the signatures exported by the executor library."""
+    lib.execute_instruction.argtypes = [POINTER(CPU8085Functions)]
+    lib.execute_instruction.restype = c_int
+    # Libraries built before the native entry point existed only support the callback backend
+    if hasattr(lib, 'execute_native'):
+        lib.execute_native.argtypes = [c_void_p, c_void_p, POINTER(CPU8085Functions), c_uint32, POINTER(c_uint32)]
+        lib.execute_native.restype = c_int
+
+_LIBRARY_CONFIGURATORS = {
+    'memory': _configure_memory,
+    'registers': _configure_registers,
+    'executor': _configure_executor,
+}
+
+# Loaded library handles and load failures, filled on first use
+_libraries = {}
+_library_errors = {}
+
+def library_filenames(name):
+    """
+    Get the platform specific file names a shared library may be built as.
+
+    Keyword arguments:
+    name -- library name without prefix or extension, e.g. 'memory' (str)
+
+    Return: candidate file names in lookup order (list)
+    """
+    if sys.platform == 'win32':
+        return [f'{name}.dll']
+    if sys.platform == 'darwin':
+        return [f'{name}.dylib', f'lib{name}.dylib', f'{name}.so']
+    return [f'{name}.so', f'lib{name}.so']
+
+def load_library(name):
+    """
+    Load a shared library on first use and cache its handle.
+
+    Keyword arguments:
+    name -- library name, one of 'memory', 'registers' or 'executor' (str)
+
+    Return: the loaded library (CDLL)
+    """
+    lib = _libraries.get(name)
+    if lib is not None:
+        return lib
+    if name in _library_errors:
+        raise BackendError(_library_errors[name])
+    errors = []
+    for filename in library_filenames(name):
+        path = os.path.join(LIBRARY_DIR, filename)
+        if not os.path.exists(path):
+            continue
+        try:
+            lib = CDLL(path)
+            _LIBRARY_CONFIGURATORS[name](lib)
+        except (OSError, AttributeError) as e:
+            errors.append(f"{path}: {e}")
+            continue
+        _libraries[name] = lib
+        return lib
+    if not errors:
+        errors.append(f"none of {', '.join(library_filenames(name))} found in {LIBRARY_DIR}")
+    _library_errors[name] = f"Cannot load the {name} library: " + '; '.join(errors)
+    raise BackendError(_library_errors[name])
 
 class Memory:
     """Wrapper for the memory DLL functions."""
@@ -65,7 +172,8 @@ class Memory:
 
         Return: None
         """
-        self.handle = memory_dll.create_memory()
+        self._lib = load_library('memory')
+        self.handle = self._lib.create_memory()
         
     def __del__(self):
         """
@@ -76,7 +184,8 @@ class Memory:
 
         Return: None
         """
-        memory_dll.destroy_memory(self.handle)
+        if getattr(self, 'handle', None):
+            self._lib.destroy_memory(self.handle)
         
     def read(self, address):
         """
@@ -87,7 +196,7 @@ class Memory:
 
         Return: the byte read (int)
         """
-        return memory_dll.read_memory(self.handle, c_uint16(address))
+        return self._lib.read_memory(self.handle, c_uint16(address))
         
     def write(self, address, value):
         """
@@ -99,7 +208,78 @@ class Memory:
 
         Return: None
         """
-        memory_dll.write_memory(self.handle, c_uint16(address), c_uint8(value))
+        self._lib.write_memory(self.handle, c_uint16(address), c_uint8(value))
+
+    def read_block(self, address, length):
+        """
+        Read a contiguous block of memory in a single call.
+
+        Keyword arguments:
+        address -- first memory address to read (int)
+        length -- number of bytes to read, clipped at the end of memory (int)
+
+        Return: the bytes read (bytes)
+        """
+        length = min(length, MEMORY_SIZE - address)
+        buffer = create_string_buffer(length)
+        self._lib.read_block(self.handle, c_uint16(address), buffer, c_uint32(length))
+        return buffer.raw
+
+    def write_block(self, address, data):
+        """
+        Write a contiguous block of memory in a single call. Marks the pages
+        dirty but is not recorded in the write journal.
+
+        Keyword arguments:
+        address -- first memory address to write (int)
+        data -- bytes to write, clipped at the end of memory (bytes)
+
+        Return: None
+        """
+        data = bytes(data)
+        self._lib.write_block(self.handle, c_uint16(address), data, c_uint32(len(data)))
+
+    def take_dirty_pages(self):
+        """
+        Get the pages written since the last call and clear the dirty bitmap.
+
+        Keyword arguments:
+        None --
+
+        Return: dirty page numbers, a page being PAGE_SIZE bytes (list)
+        """
+        bitmap = create_string_buffer(PAGE_COUNT)
+        if not self._lib.take_dirty_pages(self.handle, bitmap):
+            return []
+        return [page for page, dirty in enumerate(bitmap.raw) if dirty]
+
+    def set_journal(self, enabled):
+        """
+        Enable or disable the write journal, discarding any recorded writes.
+
+        Keyword arguments:
+        enabled -- True to record the old value of every byte write (bool)
+
+        Return: None
+        """
+        self._lib.set_journal(self.handle, c_uint8(1 if enabled else 0))
+
+    def drain_journal(self):
+        """
+        Get the writes recorded since the last drain and empty the journal.
+
+        Keyword arguments:
+        None --
+
+        Return: list of (address, old value) tuples, oldest first (list)
+        """
+        entries = getattr(self, '_journal_entries', None)
+        if entries is None:
+            entries = self._journal_entries = (JournalEntry * JOURNAL_SIZE)()
+        length = self._lib.drain_journal(self.handle, entries)
+        if length > JOURNAL_SIZE:
+            raise RuntimeError(f"Write journal overflow: {length} writes since the last drain")
+        return [(entries[i].address, entries[i].old_value) for i in range(length)]
 
 class Registers:
     """Wrapper for the registers DLL functions."""
@@ -118,7 +298,8 @@ class Registers:
 
         Return: None
         """
-        self.handle = registers_dll.create_registers()
+        self._lib = load_library('registers')
+        self.handle = self._lib.create_registers()
         
     def __del__(self):
         """
@@ -129,7 +310,8 @@ class Registers:
 
         Return: None
         """
-        registers_dll.destroy_registers(self.handle)
+        if getattr(self, 'handle', None):
+            self._lib.destroy_registers(self.handle)
         
     def read_reg(self, regname):
         """
@@ -142,7 +324,7 @@ class Registers:
         """
         reg_num = self.REG_MAP.get(regname, -1)
         if reg_num >= 0:
-            return registers_dll.read_reg(self.handle, c_uint8(reg_num))
+            return self._lib.read_reg(self.handle, c_uint8(reg_num))
         return 0
         
     def write_reg(self, regname, value):
@@ -157,7 +339,7 @@ class Registers:
         """
         reg_num = self.REG_MAP.get(regname, -1)
         if reg_num >= 0:
-            registers_dll.write_reg(self.handle, c_uint8(reg_num), c_uint8(value))
+            self._lib.write_reg(self.handle, c_uint8(reg_num), c_uint8(value))
             
     def get_flags(self):
         """
@@ -168,7 +350,7 @@ class Registers:
 
         Return: flags register contents (int)
         """
-        return registers_dll.get_flags(self.handle)
+        return self._lib.get_flags(self.handle)
         
     def set_flags(self, value):
         """
@@ -179,7 +361,7 @@ class Registers:
 
         Return: None
         """
-        registers_dll.set_flags(self.handle, c_uint8(value))
+        self._lib.set_flags(self.handle, c_uint8(value))
         
     def get_PC(self):
         """
@@ -190,7 +372,7 @@ class Registers:
 
         Return: program counter (int)
         """
-        return registers_dll.get_PC(self.handle)
+        return self._lib.get_PC(self.handle)
         
     def set_PC(self, value):
         """
@@ -201,7 +383,7 @@ class Registers:
 
         Return: None
         """
-        registers_dll.set_PC(self.handle, c_uint16(value))
+        self._lib.set_PC(self.handle, c_uint16(value))
         
     def get_SP(self):
         """
@@ -212,7 +394,7 @@ class Registers:
 
         Return: stack pointer (int)
         """
-        return registers_dll.get_SP(self.handle)
+        return self._lib.get_SP(self.handle)
         
     def set_SP(self, value):
         """
@@ -223,7 +405,230 @@ class Registers:
 
         Return: None
         """
-        registers_dll.set_SP(self.handle, c_uint16(value))
+        self._lib.set_SP(self.handle, c_uint16(value))
+
+class PyMemory:
+    """Pure Python memory with the same interface as Memory."""
+
+    def __init__(self):
+        """
+        Initialize a PyMemory object with 64 KB of zeroed memory.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        self.data = bytearray(MEMORY_SIZE)
+        self.dirty = set()
+        self.journal = None
+
+    def read(self, address):
+        """
+        Read a single byte from memory.
+
+        Keyword arguments:
+        address -- memory address to read from (int)
+
+        Return: the byte read (int)
+        """
+        return self.data[address & 0xFFFF]
+
+    def write(self, address, value):
+        """
+        Write a single byte to memory.
+
+        Keyword arguments:
+        address -- memory address to write to (int)
+        value -- value to write (int)
+
+        Return: None
+        """
+        address &= 0xFFFF
+        if self.journal is not None:
+            self.journal.append((address, self.data[address]))
+        self.dirty.add(address // PAGE_SIZE)
+        self.data[address] = value & 0xFF
+
+    def read_block(self, address, length):
+        """
+        Read a contiguous block of memory.
+
+        Keyword arguments:
+        address -- first memory address to read (int)
+        length -- number of bytes to read, clipped at the end of memory (int)
+
+        Return: the bytes read (bytes)
+        """
+        return bytes(self.data[address:address + length])
+
+    def write_block(self, address, data):
+        """
+        Write a contiguous block of memory. Marks the pages dirty but is not
+        recorded in the write journal.
+
+        Keyword arguments:
+        address -- first memory address to write (int)
+        data -- bytes to write, clipped at the end of memory (bytes)
+
+        Return: None
+        """
+        data = bytes(data[:MEMORY_SIZE - address])
+        if not data:
+            return
+        self.data[address:address + len(data)] = data
+        self.dirty.update(range(address // PAGE_SIZE, (address + len(data) - 1) // PAGE_SIZE + 1))
+
+    def take_dirty_pages(self):
+        """
+        Get the pages written since the last call and clear the dirty set.
+
+        Keyword arguments:
+        None --
+
+        Return: dirty page numbers, a page being PAGE_SIZE bytes (list)
+        """
+        pages = sorted(self.dirty)
+        self.dirty = set()
+        return pages
+
+    def set_journal(self, enabled):
+        """
+        Enable or disable the write journal, discarding any recorded writes.
+
+        Keyword arguments:
+        enabled -- True to record the old value of every byte write (bool)
+
+        Return: None
+        """
+        self.journal = [] if enabled else None
+
+    def drain_journal(self):
+        """
+        Get the writes recorded since the last drain and empty the journal.
+
+        Keyword arguments:
+        None --
+
+        Return: list of (address, old value) tuples, oldest first (list)
+        """
+        entries = self.journal or []
+        if self.journal is not None:
+            self.journal = []
+        return entries
+
+class PyRegisters:
+    """Pure Python registers with the same interface as Registers."""
+
+    REG_MAP = Registers.REG_MAP
+
+    def __init__(self):
+        """
+        Initialize a PyRegisters object with every register cleared.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        self.regs = [0] * 8
+        self.flags = 0
+        self.PC = 0
+        self.SP = 0
+
+    def read_reg(self, regname):
+        """
+        Read the value from a register.
+
+        Keyword arguments:
+        regname -- register name as a string (e.g. 'A', 'B', etc.)
+
+        Return: register contents (int)
+        """
+        reg_num = self.REG_MAP.get(regname, -1)
+        if reg_num >= 0:
+            return self.regs[reg_num]
+        return 0
+
+    def write_reg(self, regname, value):
+        """
+        Write a value to a register.
+
+        Keyword arguments:
+        regname -- register name as a string (e.g. 'A', 'B', etc.)
+        value -- value to write to register (int)
+
+        Return: None
+        """
+        reg_num = self.REG_MAP.get(regname, -1)
+        if reg_num >= 0:
+            self.regs[reg_num] = value & 0xFF
+
+    def get_flags(self):
+        """
+        Get the flags register.
+
+        Keyword arguments:
+        None --
+
+        Return: flags register contents (int)
+        """
+        return self.flags
+
+    def set_flags(self, value):
+        """
+        Set the flags register.
+
+        Keyword arguments:
+        value -- new flags value (int)
+
+        Return: None
+        """
+        self.flags = value & 0xFF
+
+    def get_PC(self):
+        """
+        Get the value of the program counter.
+
+        Keyword arguments:
+        None --
+
+        Return: program counter (int)
+        """
+        return self.PC
+
+    def set_PC(self, value):
+        """
+        Set the value of the program counter.
+
+        Keyword arguments:
+        value -- new program counter value (int)
+
+        Return: None
+        """
+        self.PC = value & 0xFFFF
+
+    def get_SP(self):
+        """
+        Get the value of the stack pointer.
+
+        Keyword arguments:
+        None --
+
+        Return: stack pointer (int)
+        """
+        return self.SP
+
+    def set_SP(self, value):
+        """
+        Set the value of the stack pointer.
+
+        Keyword arguments:
+        value -- new stack pointer value (int)
+
+        Return: None
+        """
+        self.SP = value & 0xFFFF
 
 class Executor:
     """Wrapper for the executor DLL functions."""
@@ -237,9 +642,116 @@ class Executor:
 
         Return: None
         """
+        self._lib = load_library('executor')
         self.cpu = cpu
         self.cpu_funcs = self._setup_cpu_functions()
-        
+        self.cpu_funcs.options = OPTION_FAST_FORWARD
+        self._coverage = None
+
+    def set_trace(self, enabled):
+        """
+        Enable or disable the per-instruction trace output of the executor. Off by default,
+        CPU8085.execute turns it on.
+
+        Keyword arguments:
+        enabled -- True to print CPU state before each instruction (bool)
+
+        Return: None
+        """
+        if enabled:
+            self.cpu_funcs.options |= OPTION_TRACE
+        else:
+            self.cpu_funcs.options &= ~OPTION_TRACE
+
+    def set_fast_forward(self, enabled):
+        """
+        Enable or disable fast-forwarding of delay loops in run().
+
+        Keyword arguments:
+        enabled -- True to complete recognised delay loops in one step (bool)
+
+        Return: None
+        """
+        if enabled:
+            self.cpu_funcs.options |= OPTION_FAST_FORWARD
+        else:
+            self.cpu_funcs.options &= ~OPTION_FAST_FORWARD
+
+    def get_cycles(self):
+        """
+        Get the number of T-states executed so far.
+
+        Keyword arguments:
+        None --
+
+        Return: T-state count (int)
+        """
+        return self.cpu_funcs.cycles
+
+    def set_cycles(self, value):
+        """
+        Set the T-state counter.
+
+        Keyword arguments:
+        value -- new T-state count (int)
+
+        Return: None
+        """
+        self.cpu_funcs.cycles = value
+
+    def enable_coverage(self, size=COVERAGE_SIZE):
+        """
+        Start recording AFL-style edge coverage of control transfers into a fresh map.
+
+        Keyword arguments:
+        size -- number of edge counters, a power of two (default COVERAGE_SIZE)
+
+        Return: None
+        """
+        if size < 2 or size & (size - 1):
+            raise ValueError("Coverage map size must be a power of two")
+        self._coverage = (c_uint8 * size)()
+        self.cpu_funcs.coverage = cast(self._coverage, POINTER(c_uint8))
+        self.cpu_funcs.coverage_size = size
+        self.cpu_funcs.coverage_prev = 0
+
+    def disable_coverage(self):
+        """
+        Stop recording edge coverage.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        self.cpu_funcs.coverage = None
+        self._coverage = None
+
+    def reset_coverage(self):
+        """
+        Clear the edge counters and the previous branch location. Does nothing if coverage is off.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        if self._coverage is None:
+            return
+        memset(self._coverage, 0, sizeof(self._coverage))
+        self.cpu_funcs.coverage_prev = 0
+
+    def read_coverage(self):
+        """
+        Get a copy of the edge counters.
+
+        Keyword arguments:
+        None --
+
+        Return: the coverage map, None if coverage is off (bytes)
+        """
+        return None if self._coverage is None else bytes(self._coverage)
+
     def _setup_cpu_functions(self):
         """
         Setup the CPU8085Functions structure with Python callbacks.
@@ -306,36 +818,157 @@ class Executor:
         cpu_funcs.set_pc = set_pc_cb
         cpu_funcs.get_sp = get_sp_cb
         cpu_funcs.set_sp = set_sp_cb
+        self._setup_port_functions(cpu_funcs)
         
         return cpu_funcs
+
+    def _setup_port_functions(self, cpu_funcs):
+        """
+        Route IN and OUT through the devices attached to the CPU.
+
+        Keyword arguments:
+        cpu_funcs -- CPU8085Functions structure to configure
+
+        Return: None
+        """
+        @CFUNCTYPE(c_uint8, c_uint8)
+        def read_port_cb(port):
+            return self.cpu.read_port(port)
+
+        @CFUNCTYPE(None, c_uint8, c_uint8)
+        def write_port_cb(port, value):
+            self.cpu.write_port(port, value)
+
+        cpu_funcs.read_port = read_port_cb
+        cpu_funcs.write_port = write_port_cb
         
     def execute_instruction(self):
         """
         Execute a single instruction using the linked CPU8085Functions.
+        Delay loops are never fast-forwarded here.
+
+        Keyword arguments:
+        None --
+
+        Return: result code from the executor (int)
+        """
+        self.cpu_funcs.budget = 1
+        return self._lib.execute_instruction(byref(self.cpu_funcs))
+
+    def run(self, max_instructions=None):
+        """
+        Execute instructions until HLT, an unknown opcode or the budget is exhausted,
+        fast-forwarding delay loops unless disabled with set_fast_forward.
+
+        Keyword arguments:
+        max_instructions -- instruction budget, None for no limit (default None)
+
+        Return: tuple of (last result code, instructions executed) (tuple)
+        """
+        cpu_funcs = self.cpu_funcs
+        funcs_ref = byref(cpu_funcs)
+        execute_instruction = self._lib.execute_instruction
+        executed = 0
+        result = RESULT_CONTINUE
+        while max_instructions is None or executed < max_instructions:
+            cpu_funcs.budget = 0xFFFFFFFF if max_instructions is None else max_instructions - executed
+            result = execute_instruction(funcs_ref)
+            if result != RESULT_CONTINUE:
+                break
+            executed += cpu_funcs.retired
+        return result, executed
+
+class NativeExecutor(Executor):
+    """Executor running entirely inside the executor library on native Memory and Registers.
+
+    No Python callbacks are involved: the library accesses the memory and
+    register structures directly, and run() loops in C as well.
+    """
+
+    def __init__(self, cpu):
+        """
+        Initialize a NativeExecutor object.
+
+        Keyword arguments:
+        cpu -- CPU8085 object backed by Memory and Registers
+
+        Return: None
+        """
+        self._lib = load_library('executor')
+        if not hasattr(self._lib, 'execute_native'):
+            raise BackendError("The executor library has no execute_native entry point, rebuild it with make")
+        if not isinstance(cpu.memory, Memory) or not isinstance(cpu.registers, Registers):
+            raise TypeError("NativeExecutor requires native Memory and Registers objects")
+        self.cpu = cpu
+        # The library supplies its own memory and register accessors
+        self.cpu_funcs = CPU8085Functions()
+        self.cpu_funcs.options = OPTION_FAST_FORWARD
+        self._setup_port_functions(self.cpu_funcs)
+        self._coverage = None
+        self._executed = c_uint32()
+
+    def _execute(self, max_instructions):
+        result = self._lib.execute_native(self.cpu.memory.handle, self.cpu.registers.handle,
+                                          byref(self.cpu_funcs), c_uint32(max_instructions),
+                                          byref(self._executed))
+        return result, self._executed.value
+
+    def execute_instruction(self):
+        """
+        Execute a single instruction natively.
 
         Keyword arguments:
         None --
 
         Return: result code from the executor (int)
         """
-        return executor_dll.execute_instruction(byref(self.cpu_funcs))
+        return self._execute(1)[0]
+
+    def run(self, max_instructions=None):
+        """
+        Execute instructions natively until HLT, an unknown opcode or the budget is exhausted.
+
+        Keyword arguments:
+        max_instructions -- instruction budget, None for no limit (default None)
+
+        Return: tuple of (last result code, instructions executed) (tuple)
+        """
+        if max_instructions is not None:
+            return self._execute(max_instructions)
+        executed = 0
+        while True:
+            result, count = self._execute(0xFFFFFFFF)
+            executed += count
+            if result != RESULT_CONTINUE:
+                return result, executed
 
 class CPU8085:
     """CPU8085 class to emulate an 8085 CPU."""
     
-    def __init__(self, memory=None, registers=None):
+    def __init__(self, memory=None, registers=None, executor=None, backend=None):
         """
         Construct a CPU8085 object.
 
         Keyword arguments:
         memory -- Memory object to use for memory operations (default None)
         registers -- Registers object to use for register operations (default None)
+        executor -- executor class driving the CPU, e.g. pyexecutor.PyExecutor (default None)
+        backend -- Backend or backend name supplying whatever is not given explicitly (default 'callback')
 
         Return: CPU8085 object
         """
-        self.memory = memory if memory else Memory()
-        self.registers = registers if registers else Registers()
-        self.executor = Executor(self)
+        if not isinstance(backend, Backend):
+            backend = get_backend(backend or 'callback')
+        self.backend = backend
+        # Port number -> device, see attach_device
+        self.devices = {}
+        # Set when a nondeterministic device is read or written
+        self.nondeterministic_io = False
+        # When a list, every port access is appended as (port, None) for IN or (port, value) for OUT
+        self.io_log = None
+        self.memory = memory if memory else backend.memory_class()
+        self.registers = registers if registers else backend.registers_class()
+        self.executor = (executor or backend.executor_class)(self)
         
         self.set_PC(0)
         self.set_SP(0xF000)
@@ -377,6 +1010,92 @@ class CPU8085:
         """
         self.memory.write(address, value)
 
+    def read_block(self, address, length):
+        """
+        Read a contiguous block of memory.
+
+        Keyword arguments:
+        address -- first address to read (int)
+        length -- number of bytes to read (int)
+
+        Return: the bytes read (bytes)
+        """
+        return self.memory.read_block(address, length)
+
+    def write_block(self, address, data):
+        """
+        Write a contiguous block of memory in a single call.
+
+        Keyword arguments:
+        address -- first address to write (int)
+        data -- bytes to write (bytes)
+
+        Return: None
+        """
+        self.memory.write_block(address, data)
+
+    def attach_device(self, port, device):
+        """
+        Attach an I/O device to a port, replacing any device already there.
+
+        Keyword arguments:
+        port -- port number, 0-255 (int)
+        device -- object with read(port), write(port, value) and a deterministic attribute, see devices.Device
+
+        Return: None
+        """
+        if not 0 <= port <= 0xFF:
+            raise ValueError(f"Port {port} is outside 0-255")
+        self.devices[port] = device
+
+    def detach_device(self, port):
+        """
+        Detach the device attached to a port.
+
+        Keyword arguments:
+        port -- port number (int)
+
+        Return: the detached device, None if there was none
+        """
+        return self.devices.pop(port, None)
+
+    def read_port(self, port):
+        """
+        Read a byte from an I/O port. Ports without a device read as FFH.
+
+        Keyword arguments:
+        port -- port number (int)
+
+        Return: the byte read (int)
+        """
+        if self.io_log is not None:
+            self.io_log.append((port, None))
+        device = self.devices.get(port)
+        if device is None:
+            return 0xFF
+        if not getattr(device, 'deterministic', False):
+            self.nondeterministic_io = True
+        return device.read(port) & 0xFF
+
+    def write_port(self, port, value):
+        """
+        Write a byte to an I/O port. Writes to ports without a device are discarded.
+
+        Keyword arguments:
+        port -- port number (int)
+        value -- byte to write (int)
+
+        Return: None
+        """
+        if self.io_log is not None:
+            self.io_log.append((port, value))
+        device = self.devices.get(port)
+        if device is None:
+            return
+        if not getattr(device, 'deterministic', False):
+            self.nondeterministic_io = True
+        device.write(port, value)
+
     def read_register(self, regname):
         """
         Read from a CPU register.
@@ -466,15 +1185,69 @@ class CPU8085:
         """
         self.registers.set_SP(value)
 
+    def get_cycles(self):
+        """
+        Get the number of T-states executed so far.
+
+        Keyword arguments:
+        None --
+
+        Return: T-state count (int)
+        """
+        return self.executor.get_cycles()
+
+    def set_cycles(self, value):
+        """
+        Set the T-state counter.
+
+        Keyword arguments:
+        value -- new T-state count (int)
+
+        Return: None
+        """
+        self.executor.set_cycles(value)
+
+    def get_register_state(self):
+        """
+        Capture every register, the flags, PC and SP.
+
+        Keyword arguments:
+        None --
+
+        Return: register values keyed by name (dict)
+        """
+        state = {name: self.read_register(name) for name in REGISTER_NAMES}
+        state['flags'] = self.get_flags()
+        state['PC'] = self.get_PC()
+        state['SP'] = self.get_SP()
+        return state
+
+    def set_register_state(self, state):
+        """
+        Restore registers captured by get_register_state.
+
+        Keyword arguments:
+        state -- register values keyed by name (dict)
+
+        Return: None
+        """
+        for name in REGISTER_NAMES:
+            self.write_register(name, state[name])
+        self.set_flags(state['flags'])
+        self.set_PC(state['PC'])
+        self.set_SP(state['SP'])
+
     def execute(self):
         """
-        Continuously execute instructions until a HALT or quit condition.
+        Continuously execute instructions until a HALT or quit condition, printing
+        the CPU state before each instruction.
 
         Keyword arguments:
         None --
 
         Return: None
         """
+        self.executor.set_trace(True)
         instruction_count = 0
         while True:
             instruction_count += 1
@@ -486,3 +1259,151 @@ class CPU8085:
                 print(f"Execution stopped: result code {result}")
                 break
 
+    def run(self, max_instructions=None, cache=None):
+        """
+        Execute instructions without prompting until HLT, an unknown opcode
+        or the instruction budget is exhausted.
+
+        Keyword arguments:
+        max_instructions -- instruction budget, None for no limit (default None)
+        cache -- cache.ResultCache reusing the results of identical earlier runs (default None)
+
+        Return: tuple of (last result code, instructions executed) (tuple)
+        """
+        if cache is not None:
+            return cache.run(self, max_instructions)
+        executor_run = getattr(self.executor, 'run', None)
+        if executor_run is not None:
+            return executor_run(max_instructions)
+        execute_instruction = self.executor.execute_instruction
+        executed = 0
+        result = RESULT_CONTINUE
+        while max_instructions is None or executed < max_instructions:
+            result = execute_instruction()
+            if result != RESULT_CONTINUE:
+                break
+            executed += 1
+        return result, executed
+
+class Backend:
+    """An execution backend: the memory, registers and executor implementations to use together."""
+
+    def __init__(self, name, memory_class, registers_class, executor_class, libraries=(), symbols=()):
+        """
+        Initialize a Backend object.
+
+        Keyword arguments:
+        name -- backend name (str)
+        memory_class -- class used for memory (type)
+        registers_class -- class used for registers (type)
+        executor_class -- class used for the executor (type)
+        libraries -- shared libraries the backend needs (default ())
+        symbols -- (library, symbol) pairs the libraries must export (default ())
+
+        Return: None
+        """
+        self.name = name
+        self.memory_class = memory_class
+        self.registers_class = registers_class
+        self.executor_class = executor_class
+        self.libraries = libraries
+        self.symbols = symbols
+
+    def __repr__(self):
+        return f"Backend({self.name!r})"
+
+    def check(self):
+        """
+        Load the shared libraries of the backend, raising if any is unusable.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        for name in self.libraries:
+            load_library(name)
+        for library, symbol in self.symbols:
+            if not hasattr(load_library(library), symbol):
+                raise BackendError(f"The {library} library does not export {symbol}, rebuild it with make")
+
+    def available(self):
+        """
+        Check whether the backend can be used in this process.
+
+        Keyword arguments:
+        None --
+
+        Return: True if every shared library loads (bool)
+        """
+        try:
+            self.check()
+        except BackendError:
+            return False
+        return True
+
+    def create_cpu(self):
+        """
+        Create a CPU using this backend.
+
+        Keyword arguments:
+        None --
+
+        Return: CPU8085 object
+        """
+        return CPU8085(backend=self)
+
+BACKENDS = {
+    'native': Backend('native', Memory, Registers, NativeExecutor,
+                      libraries=('memory', 'registers', 'executor'),
+                      symbols=(('executor', 'execute_native'),)),
+    'callback': Backend('callback', Memory, Registers, Executor,
+                        libraries=('memory', 'registers', 'executor')),
+    'python': Backend('python', PyMemory, PyRegisters, PyExecutor),
+}
+
+# Preference order, also the order fallbacks are tried in
+BACKEND_ORDER = ['native', 'callback', 'python']
+
+def available_backends():
+    """
+    List the backends usable in this process.
+
+    Keyword arguments:
+    None --
+
+    Return: backend names in preference order (list)
+    """
+    return [name for name in BACKEND_ORDER if BACKENDS[name].available()]
+
+def get_backend(name=None, fallback=True):
+    """
+    Get an execution backend by name, loading its shared libraries on first use.
+
+    Keyword arguments:
+    name -- 'native', 'callback' or 'python', None for the fastest available (default None)
+    fallback -- use the next backend in BACKEND_ORDER if the requested one is unavailable (default True)
+
+    Return: Backend object
+    """
+    if name is not None and name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {', '.join(BACKEND_ORDER)}")
+    if name is None:
+        candidates = BACKEND_ORDER
+    elif fallback:
+        candidates = BACKEND_ORDER[BACKEND_ORDER.index(name):]
+    else:
+        candidates = [name]
+    errors = []
+    for candidate in candidates:
+        backend = BACKENDS[candidate]
+        try:
+            backend.check()
+        except BackendError as e:
+            errors.append(str(e))
+            continue
+        if name is not None and candidate != name:
+            warnings.warn(f"Backend '{name}' is unavailable, falling back to '{candidate}': {errors[0]}",
+                          RuntimeWarning, stacklevel=2)
+        return backend
+    raise BackendError('; '.join(errors))
@@ -0,0 +1,783 @@
+"""Pure Python 8085 executor.
+
+Mirrors executor.c instruction for instruction so it can serve as a reference
+model for the C executor and as an execution path that needs no compiled
+libraries.
+"""
+
+# Flag bit positions
+FLAG_S = 0x80
+FLAG_Z = 0x40
+FLAG_AC = 0x10
+FLAG_P = 0x04
+FLAG_C = 0x01
+
+# Register names in executor encoding order (B=0 ... M=6, A=7)
+REG_NAMES = ['B', 'C', 'D', 'E', 'H', 'L', 'M', 'A']
+REG_M = 6
+
+# Register pairs in encoding order (BC=0, DE=1, HL=2, SP=3)
+PAIR_NAMES = [('B', 'C'), ('D', 'E'), ('H', 'L')]
+
+
+def _szp_table():
+    """
+    Build the sign/zero/parity flag lookup table.
+
+    Keyword arguments:
+    None --
+
+    Return: list of 256 flag bytes indexed by result (list)
+    """
+    table = []
+    for result in range(256):
+        flags = 0
+        if result & 0x80:
+            flags |= FLAG_S
+        if result == 0:
+            flags |= FLAG_Z
+        if bin(result).count('1') % 2 == 0:
+            flags |= FLAG_P
+        table.append(flags)
+    return table
+
+
+SZP = _szp_table()
+
+
+def _cycle_table():
+    """
+    Build the T-state lookup table. Conditional branches hold their not-taken
+    cost, TAKEN_EXTRA is added when the branch is taken.
+
+    Keyword arguments:
+    None --
+
+    Return: list of 256 T-state counts indexed by opcode, 0 for unknown opcodes (list)
+    """
+    table = [0] * 256
+    for opcode in range(256):
+        low3 = opcode & 0x07
+        low4 = opcode & 0x0F
+        memory_operand = low3 == REG_M or (opcode >> 3) & 0x07 == REG_M
+        if opcode < 0x40:
+            if low3 == 0x6:                # MVI
+                table[opcode] = 10 if opcode == 0x36 else 7
+            elif low4 in (0x1, 0x9):       # LXI, DAD
+                table[opcode] = 10
+            elif low4 in (0x3, 0xB):       # INX, DCX
+                table[opcode] = 6
+            elif low3 in (0x4, 0x5):       # INR, DCR
+                table[opcode] = 10 if opcode in (0x34, 0x35) else 4
+        elif opcode < 0x80:                # MOV
+            table[opcode] = 7 if memory_operand else 4
+        elif opcode < 0xC0:                # ALU register
+            table[opcode] = 7 if low3 == REG_M else 4
+        else:
+            if low3 == 0x7:                # RST
+                table[opcode] = 12
+            elif low4 == 0x1:              # POP
+                table[opcode] = 10
+            elif low4 == 0x5:              # PUSH
+                table[opcode] = 12
+            elif low3 == 0x2:              # Jcc
+                table[opcode] = 7
+            elif low3 == 0x4:              # Ccc
+                table[opcode] = 9
+            elif low3 == 0x0:              # Rcc
+                table[opcode] = 6
+            elif low3 == 0x6:              # ALU immediate
+                table[opcode] = 7
+    singles = {
+        0x00: 4, 0x02: 7, 0x12: 7, 0x0A: 7, 0x1A: 7,
+        0x07: 4, 0x0F: 4, 0x17: 4, 0x1F: 4,
+        0x22: 16, 0x2A: 16, 0x32: 13, 0x3A: 13,
+        0x20: 4, 0x30: 4, 0x27: 4, 0x2F: 4, 0x37: 4, 0x3F: 4,
+        0x76: 5,
+        0xC3: 10, 0xCD: 18, 0xC9: 10, 0xD3: 10, 0xDB: 10,
+        0xEB: 4, 0xE3: 16, 0xE9: 6, 0xF9: 6, 0xF3: 4, 0xFB: 4,
+    }
+    for opcode, cycles in singles.items():
+        table[opcode] = cycles
+    # Undocumented opcodes are not executed
+    for opcode in (0x08, 0x10, 0x18, 0x28, 0x38, 0xCB, 0xD9, 0xDD, 0xED, 0xFD):
+        table[opcode] = 0
+    return table
+
+
+CYCLES = _cycle_table()
+
+# Extra T-states of a taken Jcc, Ccc and Rcc
+JUMP_TAKEN_EXTRA = 3
+CALL_TAKEN_EXTRA = 9
+RETURN_TAKEN_EXTRA = 6
+
+# Default number of edge coverage counters, a power of two
+COVERAGE_SIZE = 0x2000
+
+# Opcodes that may start a fast-forwardable delay loop: DCR r (not M) and DCX B/D/H
+LOOP_HEADS = frozenset([0x05, 0x0D, 0x15, 0x1D, 0x25, 0x2D, 0x3D, 0x0B, 0x1B, 0x2B])
+
+
+class PyExecutor:
+    """Executor implemented in Python on top of the CPU8085 accessors."""
+
+    def __init__(self, cpu):
+        """
+        Initialize a PyExecutor object.
+
+        Keyword arguments:
+        cpu -- CPU8085 object to link the executor with
+
+        Return: None
+        """
+        self.cpu = cpu
+        self.trace = False
+        self.fast_forward = True
+        self.cycles = 0
+        self.coverage = None
+        self.coverage_prev = 0
+        self.dispatch = self._build_dispatch()
+
+    def set_trace(self, enabled):
+        """
+        Enable or disable the per-instruction trace output. Off by default,
+        CPU8085.execute turns it on.
+
+        Keyword arguments:
+        enabled -- True to print CPU state before each instruction (bool)
+
+        Return: None
+        """
+        self.trace = bool(enabled)
+
+    def set_fast_forward(self, enabled):
+        """
+        Enable or disable fast-forwarding of delay loops in run().
+
+        Keyword arguments:
+        enabled -- True to complete recognised delay loops in one step (bool)
+
+        Return: None
+        """
+        self.fast_forward = bool(enabled)
+
+    def get_cycles(self):
+        """
+        Get the number of T-states executed so far.
+
+        Keyword arguments:
+        None --
+
+        Return: T-state count (int)
+        """
+        return self.cycles
+
+    def set_cycles(self, value):
+        """
+        Set the T-state counter.
+
+        Keyword arguments:
+        value -- new T-state count (int)
+
+        Return: None
+        """
+        self.cycles = value
+
+    def enable_coverage(self, size=COVERAGE_SIZE):
+        """
+        Start recording AFL-style edge coverage of control transfers into a fresh map.
+
+        Keyword arguments:
+        size -- number of edge counters, a power of two (default COVERAGE_SIZE)
+
+        Return: None
+        """
+        if size < 2 or size & (size - 1):
+            raise ValueError("Coverage map size must be a power of two")
+        self.coverage = bytearray(size)
+        self.coverage_prev = 0
+
+    def disable_coverage(self):
+        """
+        Stop recording edge coverage.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        self.coverage = None
+
+    def reset_coverage(self):
+        """
+        Clear the edge counters and the previous branch location. Does nothing if coverage is off.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        if self.coverage is None:
+            return
+        self.coverage[:] = bytes(len(self.coverage))
+        self.coverage_prev = 0
+
+    def read_coverage(self):
+        """
+        Get a copy of the edge counters.
+
+        Keyword arguments:
+        None --
+
+        Return: the coverage map, None if coverage is off (bytes)
+        """
+        return None if self.coverage is None else bytes(self.coverage)
+
+    # --- state helpers -------------------------------------------------
+
+    def _read_pair(self, rp):
+        if rp == 3:
+            return self.cpu.get_SP()
+        high, low = PAIR_NAMES[rp]
+        return (self.cpu.read_register(high) << 8) | self.cpu.read_register(low)
+
+    def _write_pair(self, rp, value):
+        value &= 0xFFFF
+        if rp == 3:
+            self.cpu.set_SP(value)
+            return
+        high, low = PAIR_NAMES[rp]
+        self.cpu.write_register(high, value >> 8)
+        self.cpu.write_register(low, value & 0xFF)
+
+    def _read_operand(self, reg):
+        if reg == REG_M:
+            return self.cpu.read_memory(self._read_pair(2))
+        return self.cpu.read_register(REG_NAMES[reg])
+
+    def _write_operand(self, reg, value):
+        if reg == REG_M:
+            self.cpu.write_memory(self._read_pair(2), value & 0xFF)
+        else:
+            self.cpu.write_register(REG_NAMES[reg], value & 0xFF)
+
+    def _read_address(self, pc):
+        low = self.cpu.read_memory((pc + 1) & 0xFFFF)
+        high = self.cpu.read_memory((pc + 2) & 0xFFFF)
+        return (high << 8) | low
+
+    def _add(self, a, b, carry):
+        total = a + b + carry
+        result = total & 0xFF
+        flags = SZP[result]
+        if total > 0xFF:
+            flags |= FLAG_C
+        if (a & 0x0F) + (b & 0x0F) + carry > 0x0F:
+            flags |= FLAG_AC
+        self.cpu.set_flags(flags)
+        return result
+
+    def _sub(self, a, b, borrow):
+        result = (a - b - borrow) & 0xFF
+        flags = SZP[result]
+        if a < b + borrow:
+            flags |= FLAG_C
+        if (a & 0x0F) + (~b & 0x0F) + (0 if borrow else 1) > 0x0F:
+            flags |= FLAG_AC
+        self.cpu.set_flags(flags)
+        return result
+
+    def _push(self, value):
+        sp = self.cpu.get_SP()
+        self.cpu.write_memory((sp - 1) & 0xFFFF, (value >> 8) & 0xFF)
+        self.cpu.write_memory((sp - 2) & 0xFFFF, value & 0xFF)
+        self.cpu.set_SP((sp - 2) & 0xFFFF)
+
+    def _pop(self):
+        sp = self.cpu.get_SP()
+        low = self.cpu.read_memory(sp)
+        high = self.cpu.read_memory((sp + 1) & 0xFFFF)
+        self.cpu.set_SP((sp + 2) & 0xFFFF)
+        return (high << 8) | low
+
+    def _condition(self, opcode):
+        flags = self.cpu.get_flags()
+        ccc = (opcode >> 3) & 0x07
+        mask = (FLAG_Z, FLAG_C, FLAG_P, FLAG_S)[ccc >> 1]
+        is_set = (flags & mask) != 0
+        return is_set if ccc & 1 else not is_set
+
+    def _record_edge(self, target, count=1):
+        # Mirrors record_edge in executor.c
+        coverage = self.coverage
+        location = ((target >> 4) ^ (target << 8)) & (len(coverage) - 1)
+        index = location ^ self.coverage_prev
+        coverage[index] = min(coverage[index] + 1, 0xFF)
+        if count > 1:
+            index = location ^ (location >> 1)
+            coverage[index] = min(coverage[index] + count - 1, 0xFF)
+        self.coverage_prev = location >> 1
+
+    def _branch(self, target):
+        target &= 0xFFFF
+        if self.coverage is not None:
+            self._record_edge(target)
+        self.cpu.set_PC(target)
+        return 1
+
+    def _next(self, pc, size):
+        self.cpu.set_PC((pc + size) & 0xFFFF)
+        return 1
+
+    # --- instruction groups --------------------------------------------
+
+    def _nop(self, opcode, pc):
+        return self._next(pc, 1)
+
+    def _unknown(self, opcode, pc):
+        return -1
+
+    def _hlt(self, opcode, pc):
+        return 0
+
+    def _mvi(self, opcode, pc):
+        self._write_operand((opcode >> 3) & 0x07, self.cpu.read_memory((pc + 1) & 0xFFFF))
+        return self._next(pc, 2)
+
+    def _lxi(self, opcode, pc):
+        self._write_pair((opcode >> 4) & 0x03, self._read_address(pc))
+        return self._next(pc, 3)
+
+    def _stax(self, opcode, pc):
+        self.cpu.write_memory(self._read_pair((opcode >> 4) & 0x01), self.cpu.read_register('A'))
+        return self._next(pc, 1)
+
+    def _ldax(self, opcode, pc):
+        self.cpu.write_register('A', self.cpu.read_memory(self._read_pair((opcode >> 4) & 0x01)))
+        return self._next(pc, 1)
+
+    def _dad(self, opcode, pc):
+        total = self._read_pair(2) + self._read_pair((opcode >> 4) & 0x03)
+        self._write_pair(2, total)
+        flags = self.cpu.get_flags() & ~FLAG_C
+        if total > 0xFFFF:
+            flags |= FLAG_C
+        self.cpu.set_flags(flags)
+        return self._next(pc, 1)
+
+    def _inx(self, opcode, pc):
+        rp = (opcode >> 4) & 0x03
+        self._write_pair(rp, self._read_pair(rp) + 1)
+        return self._next(pc, 1)
+
+    def _dcx(self, opcode, pc):
+        rp = (opcode >> 4) & 0x03
+        self._write_pair(rp, self._read_pair(rp) - 1)
+        return self._next(pc, 1)
+
+    def _inr(self, opcode, pc):
+        reg = (opcode >> 3) & 0x07
+        result = (self._read_operand(reg) + 1) & 0xFF
+        flags = SZP[result] | (self.cpu.get_flags() & FLAG_C)
+        if result & 0x0F == 0:
+            flags |= FLAG_AC
+        self._write_operand(reg, result)
+        self.cpu.set_flags(flags)
+        return self._next(pc, 1)
+
+    def _dcr(self, opcode, pc):
+        reg = (opcode >> 3) & 0x07
+        value = self._read_operand(reg)
+        result = (value - 1) & 0xFF
+        flags = SZP[result] | (self.cpu.get_flags() & FLAG_C)
+        if value & 0x0F:
+            flags |= FLAG_AC
+        self._write_operand(reg, result)
+        self.cpu.set_flags(flags)
+        return self._next(pc, 1)
+
+    def _rotate(self, opcode, pc):
+        a = self.cpu.read_register('A')
+        flags = self.cpu.get_flags()
+        if opcode == 0x07:    # RLC
+            carry = a >> 7
+            a = ((a << 1) | carry) & 0xFF
+        elif opcode == 0x0F:  # RRC
+            carry = a & 0x01
+            a = (a >> 1) | (carry << 7)
+        elif opcode == 0x17:  # RAL
+            carry = a >> 7
+            a = ((a << 1) | (flags & FLAG_C)) & 0xFF
+        else:                 # RAR
+            carry = a & 0x01
+            a = (a >> 1) | ((flags & FLAG_C) << 7)
+        self.cpu.write_register('A', a)
+        self.cpu.set_flags((flags & ~FLAG_C) | carry)
+        return self._next(pc, 1)
+
+    def _shld(self, opcode, pc):
+        addr = self._read_address(pc)
+        self.cpu.write_memory(addr, self.cpu.read_register('L'))
+        self.cpu.write_memory((addr + 1) & 0xFFFF, self.cpu.read_register('H'))
+        return self._next(pc, 3)
+
+    def _lhld(self, opcode, pc):
+        addr = self._read_address(pc)
+        self.cpu.write_register('L', self.cpu.read_memory(addr))
+        self.cpu.write_register('H', self.cpu.read_memory((addr + 1) & 0xFFFF))
+        return self._next(pc, 3)
+
+    def _sta(self, opcode, pc):
+        self.cpu.write_memory(self._read_address(pc), self.cpu.read_register('A'))
+        return self._next(pc, 3)
+
+    def _lda(self, opcode, pc):
+        self.cpu.write_register('A', self.cpu.read_memory(self._read_address(pc)))
+        return self._next(pc, 3)
+
+    def _daa(self, opcode, pc):
+        a = self.cpu.read_register('A')
+        flags = self.cpu.get_flags()
+        correction = 0
+        carry = flags & FLAG_C
+        if (a & 0x0F) > 9 or flags & FLAG_AC:
+            correction |= 0x06
+        if a > 0x99 or carry:
+            correction |= 0x60
+            carry = FLAG_C
+        result = (a + correction) & 0xFF
+        flags = SZP[result] | carry
+        if (a & 0x0F) + (correction & 0x0F) > 0x0F:
+            flags |= FLAG_AC
+        self.cpu.write_register('A', result)
+        self.cpu.set_flags(flags)
+        return self._next(pc, 1)
+
+    def _cma(self, opcode, pc):
+        self.cpu.write_register('A', ~self.cpu.read_register('A') & 0xFF)
+        return self._next(pc, 1)
+
+    def _stc(self, opcode, pc):
+        self.cpu.set_flags(self.cpu.get_flags() | FLAG_C)
+        return self._next(pc, 1)
+
+    def _cmc(self, opcode, pc):
+        self.cpu.set_flags(self.cpu.get_flags() ^ FLAG_C)
+        return self._next(pc, 1)
+
+    def _mov(self, opcode, pc):
+        self._write_operand((opcode >> 3) & 0x07, self._read_operand(opcode & 0x07))
+        return self._next(pc, 1)
+
+    def _alu(self, op, value):
+        a = self.cpu.read_register('A')
+        carry = self.cpu.get_flags() & FLAG_C
+        if op == 0:    # ADD
+            result = self._add(a, value, 0)
+        elif op == 1:  # ADC
+            result = self._add(a, value, carry)
+        elif op == 2:  # SUB
+            result = self._sub(a, value, 0)
+        elif op == 3:  # SBB
+            result = self._sub(a, value, carry)
+        elif op == 4:  # ANA
+            result = a & value
+            self.cpu.set_flags(SZP[result] | FLAG_AC)
+        elif op == 5:  # XRA
+            result = a ^ value
+            self.cpu.set_flags(SZP[result])
+        elif op == 6:  # ORA
+            result = a | value
+            self.cpu.set_flags(SZP[result])
+        else:          # CMP
+            self._sub(a, value, 0)
+            return
+        self.cpu.write_register('A', result)
+
+    def _alu_reg(self, opcode, pc):
+        self._alu((opcode >> 3) & 0x07, self._read_operand(opcode & 0x07))
+        return self._next(pc, 1)
+
+    def _alu_imm(self, opcode, pc):
+        self._alu((opcode >> 3) & 0x07, self.cpu.read_memory((pc + 1) & 0xFFFF))
+        return self._next(pc, 2)
+
+    def _jmp(self, opcode, pc):
+        return self._branch(self._read_address(pc))
+
+    def _jcc(self, opcode, pc):
+        if self._condition(opcode):
+            self.cycles += JUMP_TAKEN_EXTRA
+            return self._jmp(opcode, pc)
+        return self._branch(pc + 3)
+
+    def _call(self, opcode, pc):
+        addr = self._read_address(pc)
+        self._push((pc + 3) & 0xFFFF)
+        return self._branch(addr)
+
+    def _ccc(self, opcode, pc):
+        if self._condition(opcode):
+            self.cycles += CALL_TAKEN_EXTRA
+            return self._call(opcode, pc)
+        return self._branch(pc + 3)
+
+    def _ret(self, opcode, pc):
+        return self._branch(self._pop())
+
+    def _rcc(self, opcode, pc):
+        if self._condition(opcode):
+            self.cycles += RETURN_TAKEN_EXTRA
+            return self._ret(opcode, pc)
+        return self._branch(pc + 1)
+
+    def _rst(self, opcode, pc):
+        self._push((pc + 1) & 0xFFFF)
+        return self._branch(opcode & 0x38)
+
+    def _pop_rp(self, opcode, pc):
+        rp = (opcode >> 4) & 0x03
+        value = self._pop()
+        if rp == 3:
+            self.cpu.write_register('A', value >> 8)
+            self.cpu.set_flags(value & 0xFF)
+        else:
+            self._write_pair(rp, value)
+        return self._next(pc, 1)
+
+    def _push_rp(self, opcode, pc):
+        rp = (opcode >> 4) & 0x03
+        if rp == 3:
+            value = (self.cpu.read_register('A') << 8) | self.cpu.get_flags()
+        else:
+            value = self._read_pair(rp)
+        self._push(value)
+        return self._next(pc, 1)
+
+    def _in(self, opcode, pc):
+        port = self.cpu.read_memory((pc + 1) & 0xFFFF)
+        self.cpu.write_register('A', self.cpu.read_port(port))
+        return self._next(pc, 2)
+
+    def _out(self, opcode, pc):
+        port = self.cpu.read_memory((pc + 1) & 0xFFFF)
+        self.cpu.write_port(port, self.cpu.read_register('A'))
+        return self._next(pc, 2)
+
+    def _xchg(self, opcode, pc):
+        de = self._read_pair(1)
+        self._write_pair(1, self._read_pair(2))
+        self._write_pair(2, de)
+        return self._next(pc, 1)
+
+    def _xthl(self, opcode, pc):
+        sp = self.cpu.get_SP()
+        low = self.cpu.read_memory(sp)
+        high = self.cpu.read_memory((sp + 1) & 0xFFFF)
+        self.cpu.write_memory(sp, self.cpu.read_register('L'))
+        self.cpu.write_memory((sp + 1) & 0xFFFF, self.cpu.read_register('H'))
+        self.cpu.write_register('L', low)
+        self.cpu.write_register('H', high)
+        return self._next(pc, 1)
+
+    def _pchl(self, opcode, pc):
+        return self._branch(self._read_pair(2))
+
+    def _sphl(self, opcode, pc):
+        self.cpu.set_SP(self._read_pair(2))
+        return self._next(pc, 1)
+
+    def _build_dispatch(self):
+        """
+        Build the opcode dispatch table.
+
+        Keyword arguments:
+        None --
+
+        Return: list of 256 handlers indexed by opcode (list)
+        """
+        table = [self._unknown] * 256
+        for opcode in range(256):
+            low3 = opcode & 0x07
+            low4 = opcode & 0x0F
+            if opcode < 0x40:
+                if low3 == 0x6:
+                    table[opcode] = self._mvi
+                elif low4 == 0x1:
+                    table[opcode] = self._lxi
+                elif low4 == 0x9:
+                    table[opcode] = self._dad
+                elif low4 == 0x3:
+                    table[opcode] = self._inx
+                elif low4 == 0xB:
+                    table[opcode] = self._dcx
+                elif low3 == 0x4:
+                    table[opcode] = self._inr
+                elif low3 == 0x5:
+                    table[opcode] = self._dcr
+            elif opcode < 0x80:
+                table[opcode] = self._mov
+            elif opcode < 0xC0:
+                table[opcode] = self._alu_reg
+            else:
+                if low3 == 0x7:
+                    table[opcode] = self._rst
+                elif low4 == 0x1:
+                    table[opcode] = self._pop_rp
+                elif low4 == 0x5:
+                    table[opcode] = self._push_rp
+                elif low3 == 0x2:
+                    table[opcode] = self._jcc
+                elif low3 == 0x4:
+                    table[opcode] = self._ccc
+                elif low3 == 0x0:
+                    table[opcode] = self._rcc
+                elif low3 == 0x6:
+                    table[opcode] = self._alu_imm
+
+        singles = {
+            0x00: self._nop, 0x02: self._stax, 0x12: self._stax,
+            0x0A: self._ldax, 0x1A: self._ldax,
+            0x07: self._rotate, 0x0F: self._rotate, 0x17: self._rotate, 0x1F: self._rotate,
+            0x22: self._shld, 0x2A: self._lhld, 0x32: self._sta, 0x3A: self._lda,
+            0x20: self._nop, 0x30: self._nop,  # RIM / SIM
+            0x27: self._daa, 0x2F: self._cma, 0x37: self._stc, 0x3F: self._cmc,
+            0x76: self._hlt,
+            0xC3: self._jmp, 0xCD: self._call, 0xC9: self._ret,
+            0xD3: self._out, 0xDB: self._in,
+            0xEB: self._xchg, 0xE3: self._xthl, 0xE9: self._pchl, 0xF9: self._sphl,
+            0xF3: self._nop, 0xFB: self._nop,  # DI / EI
+        }
+        for opcode, handler in singles.items():
+            table[opcode] = handler
+        return table
+
+    # --- delay loop fast-forwarding ----------------------------------
+
+    def _fast_forward(self, opcode, pc, budget):
+        """
+        Complete a recognised delay loop starting at pc in a single step.
+
+        Two idioms are recognised, both only touching their counter, A and the flags:
+            DCR r / JNZ pc                     (r is not M)
+            DCX rp / MOV A,x / ORA y / JNZ pc  (x and y are the two halves of rp)
+        Whole iterations are executed up to the instruction budget, leaving the
+        exact state step-by-step execution would have reached.
+
+        Keyword arguments:
+        opcode -- opcode at pc, one of LOOP_HEADS (int)
+        pc -- address of the loop head (int)
+        budget -- maximum number of instructions to retire (int)
+
+        Return: number of instructions retired, 0 if no loop was fast-forwarded (int)
+        """
+        cpu = self.cpu
+        read = cpu.read_memory
+        if opcode & 0x07 == 0x5:  # DCR r
+            if read((pc + 1) & 0xFFFF) != 0xC2 or self._read_address((pc + 1) & 0xFFFF) != pc:
+                return 0
+            reg = REG_NAMES[(opcode >> 3) & 0x07]
+            value = cpu.read_register(reg)
+            iterations = min(value or 256, budget // 2)
+            if iterations < 2:
+                return 0
+            result = (value - iterations) & 0xFF
+            flags = SZP[result] | (cpu.get_flags() & FLAG_C)
+            if (result + 1) & 0x0F:
+                flags |= FLAG_AC
+            cpu.write_register(reg, result)
+            cpu.set_flags(flags)
+            exited = result == 0
+            if self.coverage is not None:
+                self._record_edge(pc, iterations - 1 if exited else iterations)
+                if exited:
+                    self._record_edge((pc + 4) & 0xFFFF)
+            cpu.set_PC((pc + 4) & 0xFFFF if exited else pc)
+            self.cycles += iterations * 14 - (3 if exited else 0)
+            return iterations * 2
+
+        # DCX rp
+        rp = (opcode >> 4) & 0x03
+        mov = read((pc + 1) & 0xFFFF)
+        ora = read((pc + 2) & 0xFFFF)
+        halves = {2 * rp, 2 * rp + 1}
+        if (mov & 0xF8 != 0x78 or ora & 0xF8 != 0xB0
+                or {mov & 0x07, ora & 0x07} != halves
+                or read((pc + 3) & 0xFFFF) != 0xC2 or self._read_address((pc + 3) & 0xFFFF) != pc):
+            return 0
+        value = self._read_pair(rp)
+        iterations = min(value or 0x10000, budget // 4)
+        if iterations < 2:
+            return 0
+        result = (value - iterations) & 0xFFFF
+        a = (result >> 8) | (result & 0xFF)
+        self._write_pair(rp, result)
+        cpu.write_register('A', a)
+        cpu.set_flags(SZP[a])
+        exited = result == 0
+        if self.coverage is not None:
+            self._record_edge(pc, iterations - 1 if exited else iterations)
+            if exited:
+                self._record_edge((pc + 6) & 0xFFFF)
+        cpu.set_PC((pc + 6) & 0xFFFF if exited else pc)
+        self.cycles += iterations * 24 - (3 if exited else 0)
+        return iterations * 4
+
+    # --- execution -----------------------------------------------------
+
+    def _execute(self, opcode, pc):
+        cpu = self.cpu
+        if self.trace:
+            flags = cpu.get_flags()
+            print(f"Executing opcode: {opcode:02X}")
+            print(f"PC: {pc:8X}")
+            print("A: {:4X} B: {:4X} C: {:4X} D: {:4X} E: {:4X} H: {:4X} L: {:4X}".format(
+                *(cpu.read_register(r) for r in 'ABCDEHL')))
+            print(f"SP: {cpu.get_SP():8X}")
+            print(f"Carry= {int(bool(flags & FLAG_C))}, Zero= {int(bool(flags & FLAG_Z))}, "
+                  f"Sign= {int(bool(flags & FLAG_S))}, Parity= {int(bool(flags & FLAG_P))}, "
+                  f"Aux Carry= {int(bool(flags & FLAG_AC))}")
+            print("---------------------------------------")
+        self.cycles += CYCLES[opcode]
+        return self.dispatch[opcode](opcode, pc)
+
+    def execute_instruction(self):
+        """
+        Execute a single instruction. Delay loops are never fast-forwarded here.
+
+        Keyword arguments:
+        None --
+
+        Return: 1 to continue, 0 on HLT, -1 on an unknown opcode (int)
+        """
+        pc = self.cpu.get_PC()
+        return self._execute(self.cpu.read_memory(pc), pc)
+
+    def run(self, max_instructions=None):
+        """
+        Execute instructions until HLT, an unknown opcode or the budget is exhausted,
+        fast-forwarding delay loops unless disabled with set_fast_forward.
+
+        Keyword arguments:
+        max_instructions -- instruction budget, None for no limit (default None)
+
+        Return: tuple of (last result code, instructions executed) (tuple)
+        """
+        cpu = self.cpu
+        executed = 0
+        result = 1
+        while max_instructions is None or executed < max_instructions:
+            pc = cpu.get_PC()
+            opcode = cpu.read_memory(pc)
+            if self.fast_forward and opcode in LOOP_HEADS:
+                budget = 0xFFFFFFFF if max_instructions is None else max_instructions - executed
+                retired = self._fast_forward(opcode, pc, budget)
+                if retired:
+                    executed += retired
+                    continue
+            result = self._execute(opcode, pc)
+            if result != 1:
+                break
+            executed += 1
+        return result, executed
@@ -0,0 +1,13 @@
+#ifndef REGISTERS_H
+#define REGISTERS_H
+
+#include <stdint.h>
+
+typedef struct {
+    uint8_t regs[8]; // A,B,C,D,E,H,L,M
+    uint8_t flags;
+    uint16_t PC;
+    uint16_t SP;
+} Registers;
+
+#endif
@@ -0,0 +1,287 @@
+"""Reverse execution for CPU8085 through periodic checkpoints and a memory-write journal.
+
+Checkpoints are taken every `checkpoint_interval` instructions and only store
+the pages dirtied since the previous checkpoint, on top of a single base image
+of memory as it was at the oldest checkpoint. Every executed instruction is
+also recorded in a bounded journal holding the registers before it and the old
+value of each byte it wrote, so short steps back are undone directly. Longer
+steps back restore the nearest checkpoint and replay forward.
+"""
+from collections import deque
+
+import py8085 as py85
+
+
+class Checkpoint:
+    """CPU state at a given position of the execution history."""
+
+    def __init__(self, position, registers, pages):
+        """
+        Initialize a Checkpoint object.
+
+        Keyword arguments:
+        position -- number of instructions executed when the checkpoint was taken (int)
+        registers -- register state as returned by CPU8085.get_register_state, plus the cycle count (dict)
+        pages -- contents of the pages dirtied since the previous checkpoint, keyed by page number (dict)
+
+        Return: None
+        """
+        self.position = position
+        self.registers = registers
+        self.pages = pages
+
+    def size(self):
+        """
+        Get the memory held by the page snapshots of this checkpoint.
+
+        Keyword arguments:
+        None --
+
+        Return: size in bytes (int)
+        """
+        return len(self.pages) * py85.PAGE_SIZE
+
+
+class TimeTravel:
+    """Drives a CPU forward while recording enough history to step backwards."""
+
+    def __init__(self, cpu, checkpoint_interval=1000, max_checkpoints=64,
+                 max_checkpoint_bytes=None, journal_size=10000):
+        """
+        Attach reverse execution to a CPU, taking the first checkpoint at its current state.
+
+        Keyword arguments:
+        cpu -- CPU8085 object to drive (CPU8085)
+        checkpoint_interval -- instructions between checkpoints (default 1000)
+        max_checkpoints -- checkpoints kept before the oldest is evicted (default 64)
+        max_checkpoint_bytes -- page snapshot bytes kept before the oldest checkpoint is evicted, None for no limit (default None)
+        journal_size -- instructions kept in the journal for direct undo (default 10000)
+
+        Return: None
+        """
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1")
+        if max_checkpoints < 1:
+            raise ValueError("max_checkpoints must be at least 1")
+        self.cpu = cpu
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        self.max_checkpoint_bytes = max_checkpoint_bytes
+        self.position = 0
+        # (position, registers and cycles before, [(address, old value), ...]) per executed instruction
+        self.journal = deque(maxlen=journal_size)
+        self.checkpoints = []
+        self.checkpoint_bytes = 0
+        # Pages that may differ from the newest checkpoint but are no longer in the dirty bitmap
+        self._pending_pages = set()
+
+        self.cpu.memory.set_journal(True)
+        self.cpu.memory.take_dirty_pages()
+        self.base = bytearray(self.cpu.memory.read_block(0, py85.MEMORY_SIZE))
+        self.checkpoints.append(Checkpoint(0, self._capture_state(), {}))
+
+    def detach(self):
+        """
+        Stop recording writes. The TimeTravel object must not be used afterwards.
+
+        Keyword arguments:
+        None --
+
+        Return: None
+        """
+        self.cpu.memory.set_journal(False)
+
+    def oldest_position(self):
+        """
+        Get the earliest position that can still be reached.
+
+        Keyword arguments:
+        None --
+
+        Return: position of the oldest checkpoint (int)
+        """
+        return self.checkpoints[0].position
+
+    def step(self):
+        """
+        Execute a single instruction, recording it in the history.
+
+        Keyword arguments:
+        None --
+
+        Return: result code from the executor (int)
+        """
+        registers = self._capture_state()
+        if (self.position % self.checkpoint_interval == 0
+                and self.checkpoints[-1].position != self.position):
+            self._take_checkpoint(registers)
+        # Discard writes made outside step, e.g. by cpu.write_memory or cpu.run, which would
+        # otherwise overflow the journal. Their pages are still dirty, so checkpoints cover them.
+        self.cpu.memory.set_journal(True)
+        result = self.cpu.executor.execute_instruction()
+        writes = self.cpu.memory.drain_journal()
+        if result == py85.RESULT_CONTINUE:
+            self.journal.append((self.position, registers, writes))
+            self.position += 1
+        return result
+
+    def run(self, max_instructions=None):
+        """
+        Execute instructions until HLT, an unknown opcode or the budget is exhausted.
+
+        Keyword arguments:
+        max_instructions -- instruction budget, None for no limit (default None)
+
+        Return: tuple of (last result code, instructions executed) (tuple)
+        """
+        executed = 0
+        result = py85.RESULT_CONTINUE
+        while max_instructions is None or executed < max_instructions:
+            result = self.step()
+            if result != py85.RESULT_CONTINUE:
+                break
+            executed += 1
+        return result, executed
+
+    def step_back(self, n=1):
+        """
+        Return to the state n instructions earlier.
+
+        Keyword arguments:
+        n -- number of instructions to undo (default 1)
+
+        Return: the new position (int)
+        """
+        target = self.position - n
+        if n < 0:
+            raise ValueError("step_back cannot move forward, use step or run")
+        if n == 0:
+            return self.position
+        if target < self.oldest_position():
+            raise ValueError(f"Cannot step back to position {target}, "
+                             f"the oldest checkpoint is at {self.oldest_position()}")
+        if n <= len(self.journal) and self.journal[-n][0] == target:
+            self._undo(n)
+        else:
+            self._seek(target)
+        return self.position
+
+    def run_back_to(self, pc):
+        """
+        Return to the most recent earlier state whose program counter is pc.
+
+        Keyword arguments:
+        pc -- program counter to search for (int)
+
+        Return: the new position, or None if pc was not reached since the oldest checkpoint (int)
+        """
+        for position, registers, _ in reversed(self.journal):
+            if registers['PC'] == pc:
+                return self.step_back(self.position - position)
+
+        origin = self.position
+        # Search older history one checkpoint interval at a time, newest first
+        end = self.journal[0][0] if self.journal else origin
+        for index in range(len(self.checkpoints) - 1, -1, -1):
+            start = self.checkpoints[index].position
+            if start >= end:
+                continue
+            self._seek(start)
+            found = None
+            while self.position < end:
+                if self.cpu.get_PC() == pc:
+                    found = self.position
+                if self.step() != py85.RESULT_CONTINUE:
+                    break
+            if found is not None:
+                self._seek(found)
+                return self.position
+            end = start
+        self._seek(origin)
+        return None
+
+    def _capture_state(self):
+        # The cycle count is kept beside the registers so that stepping back rewinds it too
+        state = self.cpu.get_register_state()
+        state['cycles'] = self.cpu.get_cycles()
+        return state
+
+    def _restore_state(self, state):
+        self.cpu.set_register_state(state)
+        self.cpu.set_cycles(state['cycles'])
+
+    def _take_checkpoint(self, registers):
+        pages = self._pending_pages.union(self.cpu.memory.take_dirty_pages())
+        self._pending_pages = set()
+        snapshot = {page: self.cpu.memory.read_block(page * py85.PAGE_SIZE, py85.PAGE_SIZE)
+                    for page in pages}
+        checkpoint = Checkpoint(self.position, registers, snapshot)
+        self.checkpoints.append(checkpoint)
+        self.checkpoint_bytes += checkpoint.size()
+        self._evict()
+
+    def _evict(self):
+        while len(self.checkpoints) > 1 and (
+                len(self.checkpoints) > self.max_checkpoints
+                or (self.max_checkpoint_bytes is not None
+                    and self.checkpoint_bytes > self.max_checkpoint_bytes)):
+            self.checkpoints.pop(0)
+            # The base image moves forward to the new oldest checkpoint
+            oldest = self.checkpoints[0]
+            for page, content in oldest.pages.items():
+                self.base[page * py85.PAGE_SIZE:(page + 1) * py85.PAGE_SIZE] = content
+            self.checkpoint_bytes -= oldest.size()
+            oldest.pages = {}
+            # History before the oldest checkpoint can no longer be reached, not even through the journal
+            while self.journal and self.journal[0][0] < oldest.position:
+                self.journal.popleft()
+
+    def _page_at(self, page, index):
+        for checkpoint in reversed(self.checkpoints[:index + 1]):
+            content = checkpoint.pages.get(page)
+            if content is not None:
+                return content
+        return bytes(self.base[page * py85.PAGE_SIZE:(page + 1) * py85.PAGE_SIZE])
+
+    def _drop_checkpoints_after(self, position):
+        while self.checkpoints[-1].position > position:
+            checkpoint = self.checkpoints.pop()
+            self._pending_pages.update(checkpoint.pages)
+            self.checkpoint_bytes -= checkpoint.size()
+
+    def _undo(self, n):
+        memory = self.cpu.memory
+        for _ in range(n):
+            position, registers, writes = self.journal.pop()
+            # write_block is not journaled, so undoing does not fill the journal
+            for address, old_value in reversed(writes):
+                memory.write_block(address, bytes((old_value,)))
+            self._restore_state(registers)
+            self.position = position
+        self._drop_checkpoints_after(self.position)
+
+    def _restore(self, index):
+        checkpoint = self.checkpoints[index]
+        memory = self.cpu.memory
+        pages = self._pending_pages.union(memory.take_dirty_pages())
+        for later in self.checkpoints[index + 1:]:
+            pages.update(later.pages)
+        for page in pages:
+            memory.write_block(page * py85.PAGE_SIZE, self._page_at(page, index))
+        memory.take_dirty_pages()
+        self._pending_pages = set()
+        self._drop_checkpoints_after(checkpoint.position)
+        self._restore_state(checkpoint.registers)
+        self.position = checkpoint.position
+        while self.journal and self.journal[-1][0] >= self.position:
+            self.journal.pop()
+
+    def _seek(self, target):
+        if target < self.oldest_position():
+            raise ValueError(f"Position {target} is older than the oldest checkpoint")
+        if target < self.position:
+            index = max(i for i, checkpoint in enumerate(self.checkpoints) if checkpoint.position <= target)
+            self._restore(index)
+        while self.position < target:
+            if self.step() != py85.RESULT_CONTINUE:
+                raise RuntimeError(f"Replay stopped at position {self.position} before reaching {target}")